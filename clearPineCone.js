@@ -1,3 +1,16 @@
+import fs from "fs";
+import path from "path";
+import { fileURLToPath } from "url";
 import pinecone from "./services/pinecone/pineconeClient.js";
 
-await pinecone.index(process.env.PINECONE_INDEX).deleteAll();
\ No newline at end of file
+const indexName = process.env.PINECONE_INDEX;
+
+await pinecone.index(indexName).deleteAll();
+
+// The AI service skips texts listed in its per-index ingested-ids ledger; reset it along with the
+// index, or re-ingesting the same texts would be reported as skipped while the index stays empty
+const dataDir =
+  process.env.AI_SERVICE_DATA_DIR ||
+  path.join(path.dirname(fileURLToPath(import.meta.url)), "python-ai-service", ".data");
+const ledgerPath = process.env.KB_INGESTED_IDS_PATH || path.join(dataDir, `kb_ingested_ids.${indexName}`);
+fs.rmSync(ledgerPath, { force: true });
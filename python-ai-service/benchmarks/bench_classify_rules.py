@@ -0,0 +1,46 @@
+"""
+Microbenchmark for the rule pass of classify_text.
+
+Compares the precompiled rule engine against the previous approach of running
+re.search with raw pattern strings for every rule, and checks both pick the same task.
+
+    python -m benchmarks.bench_classify_rules
+"""
+import re
+import timeit
+from services.text_processing import TASK_PATTERNS, match_task_rules
+
+PROMPTS = [
+    "check my inbox",
+    "what's on my calendar",
+    "schedule a meeting with the design team",
+    "send an email to john about the budget",
+    "summarize my emails",
+    "organize my files",
+    "what is the capital of france",
+    "track my spending this month",
+    "remind me to drink water",
+    "research the market for electric bikes",
+    "hello there, how have you been lately",
+    "can you help me with something later today",
+]
+
+def legacy_rule_pass(text_clean):
+    """Rule pass as classify_text ran it before rules were precompiled."""
+    for task, patterns in dict(TASK_PATTERNS).items():
+        for pattern in patterns:
+            if re.search(pattern, text_clean):
+                return task
+    return None
+
+def main(number=2000):
+    for prompt in PROMPTS:
+        assert match_task_rules(prompt) == legacy_rule_pass(prompt), prompt
+
+    for name, func in (("legacy", legacy_rule_pass), ("compiled", match_task_rules)):
+        seconds = timeit.timeit(lambda: [func(prompt) for prompt in PROMPTS], number=number)
+        per_call = seconds / (number * len(PROMPTS)) * 1e6
+        print(f"{name:>9}: {per_call:8.2f} µs per call")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Throughput benchmark for extract_event_details over a corpus of event phrases.
+
+With --baseline <git revision>, the extractor at that revision is loaded too, its
+throughput is reported alongside, and every output dict is checked to be identical.
+Phrases the baseline fails on are reported and left out of the comparison.
+
+    python -m benchmarks.bench_event_extraction --baseline <rev>
+"""
+import argparse
+import subprocess
+import time
+import types
+from services.extract_event_details import extract_event_details
+
+CORPUS = [
+    "Schedule a meeting with John tomorrow at 3pm",
+    "Lunch with Sarah on Friday at noon",
+    "Call with the design team next Monday at 10:30am for 30 minutes",
+    "Dentist appointment on 12/15 at 9am",
+    "Team review on Jan 20 at 2pm for 2 hours",
+    "Workshop on March 3rd, 2025 all-day",
+    "Coffee with Alex and Maria this afternoon",
+    "Interview with Jane Doe next week",
+    "Webinar about cloud security tonight at 8pm",
+    "Project demo on Thursday morning",
+    "Meeting to discuss the quarterly budget tomorrow",
+    "Yoga class every Tuesday evening",
+    "Dinner with Mom on Sunday at 7pm",
+    "Training session in 3 days",
+    "Conference call at midnight",
+    "Discussion regarding hiring plans on Wednesday",
+    "Presentation for the board next Friday at 11am",
+    "Celebration for Tom's birthday on 06/21/2025",
+    "Notes: bring the signed contract",
+    "Catch up with Priya sometime",
+    "Quick sync about onboarding at 4:15pm",
+    "Lesson on Saturday at 10am lasting 90 minutes",
+    "Sprint planning tomorrow morning for 1 hour",
+    "Doctor appointment on Oct 2",
+    "Review session next Thursday afternoon",
+    "Book club meeting on the first Monday of next month",
+    "Remind me about the team offsite in two weeks",
+    "Standup today at 9:45am",
+    "Meet Bob at the office",
+    "Hackathon full-day on Saturday",
+    "Sync with Lee at 15:30",
+    "Offsite all day on Friday",
+]
+
+def load_baseline(revision):
+    """Loads extract_event_details as it was at a git revision."""
+    source = subprocess.run(
+        ["git", "show", f"{revision}:./services/extract_event_details.py"],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    module = types.ModuleType("baseline_extract_event_details")
+    exec(compile(source, "baseline_extract_event_details.py", "exec"), module.__dict__)
+    return module.extract_event_details
+
+def throughput(func, corpus, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for phrase in corpus:
+            func(phrase)
+    return rounds * len(corpus) / (time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", help="git revision of the extractor to compare against")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    corpus = CORPUS
+    if args.baseline:
+        baseline = load_baseline(args.baseline)
+        corpus = []
+        for phrase in CORPUS:
+            try:
+                expected = baseline(phrase)
+            except Exception as e:
+                print(f"baseline fails on {phrase!r}: {e!r}")
+                continue
+            actual = extract_event_details(phrase)
+            if actual != expected:
+                print(f"differs on {phrase!r}: {expected['startTime']} -> {actual['startTime']}")
+            corpus.append(phrase)
+        print(f"{len(corpus)} phrases compared")
+        print(f"baseline: {throughput(baseline, corpus, args.rounds):9.1f} phrases/s")
+
+    print(f" current: {throughput(extract_event_details, corpus, args.rounds):9.1f} phrases/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Throughput and peak memory of the OCR engine against a bare pytesseract call per image.
+
+Runs each mode in its own subprocess (peak RSS is a per-process high-water mark) over a
+sample image set: the images in --images, or synthetic text pages rendered with Pillow,
+including a tall scan to exercise tiling. Requests are issued --concurrency at a time, as
+concurrent uploads would be. Needs the tesseract binary.
+
+    python -m benchmarks.bench_ocr --images ./samples --concurrency 4
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageDraw
+
+LINES = [
+    "Quarterly report: revenue grew 12% over the previous period.",
+    "Action items: finalize the budget, hire two engineers, renew the lease.",
+    "Meeting notes from the design review held on March 3rd.",
+    "Invoice 4471 is due within thirty days of receipt.",
+]
+
+def synthetic_page(width, height, noise=True):
+    """A white page of repeated text lines, with light speckle like a scan"""
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    y = 40
+    while y < height - 40:
+        draw.text((40, y), LINES[(y // 30) % len(LINES)], fill="black")
+        y += 30
+    if noise:
+        for i in range(0, width * height // 2000):
+            draw.point(((i * 7919) % width, (i * 104729) % height), fill="gray")
+    return image
+
+def sample_images(directory):
+    if directory:
+        paths = sorted(os.path.join(directory, name) for name in os.listdir(directory))
+        return [Image.open(path) for path in paths if os.path.isfile(path)]
+    return [synthetic_page(1240, 1754) for _ in range(6)] + [synthetic_page(1240, 7000)]
+
+def run_mode(mode, directory, concurrency, rounds):
+    """Runs one mode in this process and returns its figures"""
+    if mode == "baseline":
+        import pytesseract
+        ocr = pytesseract.image_to_string
+    else:
+        from services.ocr import ocr_image
+        ocr = ocr_image
+
+    images = sample_images(directory)
+    for image in images:
+        image.load()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as requests:
+        for _ in range(rounds):
+            characters = sum(len(text) for text in requests.map(lambda image: ocr(image.copy()), images))
+    elapsed = time.perf_counter() - started
+    return {
+        "images_per_second": round(rounds * len(images) / elapsed, 2),
+        "characters": characters,
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mib": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "peak_tesseract_rss_mib": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", help="directory of sample images (default: synthetic pages)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=1)
+    parser.add_argument("--mode", choices=["baseline", "engine"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.images, args.concurrency, args.rounds)))
+        return
+
+    for mode in ("baseline", "engine"):
+        command = [sys.executable, "-m", "benchmarks.bench_ocr", "--mode", mode,
+                   "--concurrency", str(args.concurrency), "--rounds", str(args.rounds)]
+        if args.images:
+            command += ["--images", args.images]
+        figures = json.loads(subprocess.run(command, check=True, capture_output=True, text=True).stdout)
+        print(f"{mode:>8}: {figures['images_per_second']:7.2f} images/s, "
+              f"peak RSS {figures['peak_rss_mib']} MiB (tesseract {figures['peak_tesseract_rss_mib']} MiB), "
+              f"{figures['characters']} characters")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Throughput of the cached-hypothesis zero-shot engine against the per-call HF pipeline.
+
+Checks both return the same labels (and scores within tolerance), then reports
+requests per second for the pipeline called once per prompt and for the engine
+classifying all prompts in one batched pass. Needs the BART-MNLI weights.
+
+    python -m benchmarks.bench_zero_shot
+"""
+import time
+from services.text_processing import TASK_LABELS, classifier, task_zero_shot
+
+PROMPTS = [
+    "can you help me plan next quarter",
+    "I need the numbers from last week",
+    "let the team know I'm running late",
+    "anything important I should look at today",
+    "put together something for the board",
+    "how are we doing on the migration",
+    "remember that I have physio on friday",
+    "what do people think about our new pricing",
+]
+
+def main(rounds=3):
+    expected = [classifier(prompt, TASK_LABELS) for prompt in PROMPTS]
+    actual = task_zero_shot.classify_batch(PROMPTS)
+    for prompt, want, got in zip(PROMPTS, expected, actual):
+        assert want["labels"] == got["labels"], prompt
+        assert all(abs(a - b) < 1e-4 for a, b in zip(want["scores"], got["scores"])), prompt
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for prompt in PROMPTS:
+            classifier(prompt, TASK_LABELS)
+    pipeline_rate = rounds * len(PROMPTS) / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        task_zero_shot.classify_batch(PROMPTS)
+    engine_rate = rounds * len(PROMPTS) / (time.perf_counter() - started)
+
+    print(f"pipeline: {pipeline_rate:7.2f} requests/s")
+    print(f"  engine: {engine_rate:7.2f} requests/s ({engine_rate / pipeline_rate:.2f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,77 @@
 import io
+import os
+import json
 import uvicorn
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
-from services.text_processing import summarize_text, classify_text
-from services.pdf_processing import extract_text_from_pdf
-from services.embedding_service import get_text_embedding
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
+from fastapi.responses import StreamingResponse, JSONResponse, Response
+from starlette.background import BackgroundTask
+from services.text_processing import summarize_text, iter_summarize_text, classify_text, classification_stats
+from services.pdf_processing import extract_text_from_pdf, iter_pdf_pages
+from services.extraction_cache import extraction_cache
+from services.upload_limits import (MAX_UPLOAD_BYTES, UploadTooLarge, BudgetExhausted,
+                                    check_upload_size, upload_size, upload_budget)
+from services.embedding_service import (get_text_embedding, get_text_embeddings, pack_embeddings,
+                                       embedding_bytes, EMBEDDING_FORMATS, EMBEDDING_DTYPES)
 from services.image_processing import extract_text_from_image
-from services.extract_event_details import extract_event_details
-from services.quick_answers import get_embedding, pinecone_index, answer_question
+from services.extract_event_details import extract_event_details, get_date_parsing_stats
+from services.event_batch import extract_events, extract_events_from_stream
+from services.worker_pools import shutdown_process_pools
+from services.quick_answers import answer_question, answer_cache, semantic_cache
+from services.knowledge_base import add_item, add_items, add_items_from_stream, iter_ndjson_items, with_throughput
+from services.model_registry import get_registry_status, warmup
+from services.batching import get_batching_stats
+from services.embedding_service import embedding_cache
+from services.vector_store import vector_store
+from services.cascade_classifier import cascade_stats
 # from services.report_generation import generate_report
 """ from services.speech_processing import convert_speech_to_text """
 """ from services.ai_decision_logging import log_ai_decision """
 
 app = FastAPI()
 
+@app.on_event("startup")
+def preload_models():
+    """Starts background loading of the models listed in PRELOAD_MODELS ("all" or comma-separated names)"""
+    preload = os.getenv("PRELOAD_MODELS", "")
+    if preload:
+        warmup([name.strip() for name in preload.split(",") if name.strip()])
+
+@app.on_event("shutdown")
+def stop_workers():
+    """Stops the process pools used for event extraction and PDF parsing"""
+    shutdown_process_pools()
+
+# Endpoints taking file uploads; their Content-Length is checked before the body is spooled
+UPLOAD_PATHS = {"/extract_pdf/", "/extract_pdf/stream", "/extract_text_from_image/"}
+# Allowance for multipart boundaries and form fields around the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    """Refuses oversized uploads from their Content-Length, before any of the body is read"""
+    if request.url.path in UPLOAD_PATHS:
+        length = request.headers.get("content-length")
+        if length and length.isdigit() and int(length) > MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES:
+            return JSONResponse(status_code=413, content={"detail": f"Upload exceeds {MAX_UPLOAD_BYTES} bytes"})
+    return await call_next(request)
+
+def check_upload(file: UploadFile):
+    """Re-checks the spooled size (chunked uploads carry no Content-Length) without reading the file"""
+    try:
+        check_upload_size(upload_size(file.file))
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+def upload_error(e):
+    """Maps upload handling failures to HTTP errors"""
+    if isinstance(e, UploadTooLarge):
+        return HTTPException(status_code=413, detail=str(e))
+    if isinstance(e, BudgetExhausted):
+        return HTTPException(status_code=503, detail=str(e))
+    return HTTPException(status_code=400, detail=f"Invalid upload: {str(e)}")
+
 class RequestData(BaseModel):
     text: str
 
@@ -31,19 +88,88 @@ class KnowledgeBaseItem(BaseModel):
     text: str
     metadata: Optional[dict] = None
 
+class KnowledgeBaseBatch(BaseModel):
+    items: List[KnowledgeBaseItem]
+
+class EventBatch(BaseModel):
+    texts: List[str]
+
+class EmbeddingBatch(BaseModel):
+    texts: List[str]
+    format: str = "json"
+    dtype: str = "float32"
+
 class ReportRequest(BaseModel):
     data: str
 
+class WarmupRequest(BaseModel):
+    models: Optional[List[str]] = None
+
 @app.get("/")
 def home():
     return {"message": "AI Service Running"}
 
+@app.get("/models/")
+def models_status():
+    """Reports load counts, handles and loaded models for this worker"""
+    return get_registry_status()
+
+@app.get("/metrics")
+def metrics():
+    """Reports runtime metrics for this worker"""
+    return {
+        "batching": get_batching_stats(),
+        "embedding_cache": embedding_cache.stats(),
+        "answer_cache": answer_cache.stats(),
+        "semantic_cache": semantic_cache.stats(),
+        "classifier_cascade": cascade_stats.snapshot(),
+        "classification": classification_stats(),
+        "event_dates": get_date_parsing_stats(),
+        "uploads": upload_budget.stats(),
+        "extraction_cache": extraction_cache.stats(),
+        "vector_store": {"backend": vector_store.name, "vectors": vector_store.count()},
+    }
+
+@app.post("/warmup")
+def warmup_models(request: Optional[WarmupRequest] = None):
+    """Preloads the requested models (all registered models by default) in the background"""
+    scheduled = warmup(request.models if request else None)
+    return {"status": "warming_up" if scheduled else "nothing_to_load", "models": scheduled}
+
+@app.get("/ready")
+def readiness():
+    """Readiness probe: the service accepts traffic immediately while models load on demand"""
+    status = get_registry_status()
+    return {
+        "ready": True,
+        "models_ready": not status["loading"] and not status["pending"],
+        "loaded": status["loaded"],
+        "loading": status["loading"],
+        "pending": status["pending"],
+    }
+
 @app.post("/summarize/")
 def summarize(request: RequestData):
     result = summarize_text(request.text)
     # log_ai_decision("summarization", "Hugging Face BART", "Summarized text content")
     return {"summary": result}
 
+@app.post("/summarize/stream")
+def summarize_stream(request: RequestData):
+    """
+    Streams summarization progress as NDJSON: one line per chunk summary as soon as
+    it is ready, then a final line with the complete summary.
+    """
+    def events():
+        try:
+            for event in iter_summarize_text(request.text):
+                yield json.dumps(event) + "\n"
+        except Exception as e:
+            # Headers are already sent, so failures are reported in-band
+            yield json.dumps({"type": "error", "detail": str(e)}) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
 @app.post("/classify/")
 def classify(request: RequestData):
     result = classify_text(request.text)
@@ -56,6 +182,27 @@ def extract_event(request: RequestData):
     # log_ai_decision("event", "Hugging Face BART", "Classified text content")
     return {"event": result}
 
+@app.post("/extract-event/batch")
+async def extract_event_batch(request: Request):
+    """
+    Extract events from many texts in one call.
+    Accepts a JSON body {"texts": [...]} or an application/x-ndjson stream of {"text": ...} lines.
+    Results come back in input order; a text that fails to parse gets an "error" instead of an "event".
+    """
+    try:
+        if "ndjson" in request.headers.get("content-type", ""):
+            async def texts():
+                async for text, _ in iter_ndjson_items(request.stream()):
+                    yield text
+            results, stats = await extract_events_from_stream(texts())
+        else:
+            batch = EventBatch(**(await request.json()))
+            results, stats = await extract_events(batch.texts)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch: {str(e)}")
+
+    return {"results": results, "stats": stats}
+
 @app.post("/qa/", response_model=AnswerResponse)
 async def get_answer(request: QuestionRequest):
     """
@@ -65,31 +212,36 @@ async def get_answer(request: QuestionRequest):
     if not request.question or len(request.question.strip()) < 3:
         raise HTTPException(status_code=400, detail="Question must be at least 3 characters long")
         
-    result = answer_question(request.question, request.context)
+    result = await answer_question(request.question, request.context)
     return result
 
 @app.post("/add-to-knowledge-base/")
 async def add_to_knowledge_base(item: KnowledgeBaseItem):
-    """Add new information to the Pinecone knowledge base"""
+    """Add new information to the knowledge base"""
     try:
-        # Generate an embedding for the text
-        vector = get_embedding(item.text)
-        
-        # Create metadata (including the full text for retrieval)
-        metadata = item.metadata or {}
-        metadata["text"] = item.text
-        
-        # Generate a unique ID (simple hash in this example)
-        item_id = str(abs(hash(item.text)))
-        
-        # Upsert to Pinecone
-        pinecone_index.upsert(
-            vectors=[(item_id, vector, metadata)]
-        )
-        
-        return {"status": "success", "id": item_id}
+        item_id, skipped = await add_item(item.text, item.metadata)
+        return {"status": "success", "id": item_id, "skipped": skipped}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to add to knowledge base: {str(e)}")
+
+@app.post("/add-to-knowledge-base/batch")
+async def add_batch_to_knowledge_base(request: Request):
+    """
+    Add many items to the knowledge base in one call.
+    Accepts a JSON body {"items": [...]} or an application/x-ndjson stream of items.
+    """
+    try:
+        if "ndjson" in request.headers.get("content-type", ""):
+            ids, stats = await add_items_from_stream(iter_ndjson_items(request.stream()))
+        else:
+            batch = KnowledgeBaseBatch(**(await request.json()))
+            ids, stats = await add_items([(item.text, item.metadata) for item in batch.items])
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to add to knowledge base: {str(e)}")
+
+    return {"status": "success", "ids": ids, "stats": with_throughput(stats)}
     
 # @app.post("/generate-report/")
 # def generate_report(request: ReportRequest):
@@ -102,18 +254,81 @@ async def add_to_knowledge_base(item: KnowledgeBaseItem):
 #         raise HTTPException(status_code=500, detail=f"Error generating report: {str(e)}")
 
 @app.post("/extract_pdf/")
-def extract_pdf(file: UploadFile = File(...)):
-    pdf_bytes = file.file.read()
-    result = extract_text_from_pdf(io.BytesIO(pdf_bytes))
+def extract_pdf(file: UploadFile = File(...), pages: Optional[str] = Form(None)):
+    """Extracts the text of a PDF; `pages` optionally limits it to a 1-based range like "1-3,7" """
+    check_upload(file)
+    try:
+        result = extract_text_from_pdf(file.file, pages)
+    except (ValueError, BudgetExhausted) as e:
+        raise upload_error(e)
     # log_ai_decision("pdf_extraction", "PyPDF2", "Extracted text from PDF document")
     return {"extracted_text": result}
 
+@app.post("/extract_pdf/stream")
+def extract_pdf_stream(file: UploadFile = File(...), pages: Optional[str] = Form(None)):
+    """
+    Streams PDF text as NDJSON: one {"type": "page", "page": n, "text": ...} line per page
+    (1-based, in order) as extraction proceeds, then a final {"type": "final", "pages": count} line.
+    """
+    check_upload(file)
+    try:
+        page_texts = iter_pdf_pages(file.file, pages)
+    except (ValueError, BudgetExhausted) as e:
+        raise upload_error(e)
+
+    def events():
+        count = 0
+        try:
+            for number, text in page_texts:
+                count += 1
+                yield json.dumps({"type": "page", "page": number + 1, "text": text}) + "\n"
+            yield json.dumps({"type": "final", "pages": count}) + "\n"
+        except Exception as e:
+            # Headers are already sent, so failures are reported in-band
+            yield json.dumps({"type": "error", "detail": str(e)}) + "\n"
+        finally:
+            page_texts.close()
+
+    # Also released if the body is never iterated (e.g. the client left before streaming began)
+    return StreamingResponse(events(), media_type="application/x-ndjson", background=BackgroundTask(page_texts.close))
+
 @app.post("/generate_embedding/")
 def generate_embedding(text: str = Form(...)):
     embedding = get_text_embedding(text)
     # log_ai_decision("embedding_generation", "SentenceTransformer", "Generated text embedding")
     return {"embedding": embedding}
 
+# Largest number of texts one batch embedding request may carry
+EMBEDDING_BATCH_MAX_TEXTS = int(os.getenv("EMBEDDING_BATCH_MAX_TEXTS", "2048"))
+
+@app.post("/generate_embeddings/batch")
+def generate_embeddings_batch(request: EmbeddingBatch, http_request: Request):
+    """
+    Embeds many texts in one encode call. `format` picks the encoding: "json" (nested float
+    lists) or "base64" (raw bytes as one string), both with "dtype" and "shape"; or "binary" for a
+    raw application/octet-stream body described by the X-Embedding-Shape and X-Embedding-Dtype
+    headers. Sending Accept: application/octet-stream selects "binary" too. `dtype` ("float32" or
+    "float16") sets the precision for every format. Raw data is little-endian, row-major.
+    """
+    fmt = "binary" if "application/octet-stream" in http_request.headers.get("accept", "") else request.format
+    if fmt not in EMBEDDING_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format {fmt!r}; expected one of {', '.join(EMBEDDING_FORMATS)}")
+    if request.dtype not in EMBEDDING_DTYPES:
+        raise HTTPException(status_code=400, detail=f"Unknown dtype {request.dtype!r}; expected one of {', '.join(EMBEDDING_DTYPES)}")
+    if not request.texts:
+        raise HTTPException(status_code=400, detail="texts must not be empty")
+    if len(request.texts) > EMBEDDING_BATCH_MAX_TEXTS:
+        raise HTTPException(status_code=413, detail=f"At most {EMBEDDING_BATCH_MAX_TEXTS} texts per request")
+
+    matrix = get_text_embeddings(request.texts)
+    if fmt == "binary":
+        return Response(
+            content=embedding_bytes(matrix, request.dtype),
+            media_type="application/octet-stream",
+            headers={"X-Embedding-Shape": f"{matrix.shape[0]},{matrix.shape[1]}", "X-Embedding-Dtype": request.dtype},
+        )
+    return pack_embeddings(matrix, fmt, request.dtype)
+
 """ @app.post("/speech_to_text/")
 def speech_to_text(file: UploadFile = File(...)):
     audio_bytes = file.file.read()
@@ -123,8 +338,14 @@ def speech_to_text(file: UploadFile = File(...)):
 
 @app.post("/extract_text_from_image/")
 def extract_text_image(file: UploadFile = File(...)):
-    image_bytes = file.file.read()
-    result = extract_text_from_image(image_bytes)
+    check_upload(file)
+    try:
+        result = extract_text_from_image(file.file)
+    except (ValueError, BudgetExhausted) as e:
+        raise upload_error(e)
+    except OSError as e:
+        # PIL raises UnidentifiedImageError (an OSError) for anything it can't decode
+        raise HTTPException(status_code=400, detail=f"Invalid image: {str(e)}")
     # log_ai_decision("image_ocr", "Tesseract OCR", "Extracted text from image")
     return {"extracted_text": result}
 
@@ -0,0 +1,194 @@
+import os
+import asyncio
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+
+DEFAULT_MAX_BATCH_SIZE = int(os.getenv("BATCH_MAX_SIZE", "8"))
+DEFAULT_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", "10"))
+DEFAULT_WORKERS = int(os.getenv("BATCH_WORKERS", "1"))
+
+# All batchers created in this process, by name
+_batchers = {}
+_batchers_lock = threading.Lock()
+
+class MicroBatcher:
+    """
+    Collects concurrent single-item requests into batches for one model.
+    A batch is run as soon as it reaches max_batch_size or the oldest request
+    has waited max_wait_ms; process_batch takes a list of items and returns
+    a list of results in the same order. Batches run on a bounded pool of
+    worker threads, which caps how many forward passes of this model run at once.
+    Whole bulk calls (e.g. encoding a document's chunks) can be run through
+    submit_call, which takes one of the same slots.
+    """
+
+    def __init__(self, name, process_batch, max_batch_size=None, max_wait_ms=None, workers=None):
+        env_name = name.upper().replace("-", "_")
+        self.name = name
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size or int(
+            os.getenv(f"BATCH_{env_name}_MAX_SIZE", DEFAULT_MAX_BATCH_SIZE))
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else float(
+            os.getenv(f"BATCH_{env_name}_MAX_WAIT_MS", DEFAULT_MAX_WAIT_MS))) / 1000
+        self.workers = workers or int(os.getenv(f"BATCH_{env_name}_WORKERS", DEFAULT_WORKERS))
+
+        self._queue = queue.Queue()
+        self._threads = []
+        self._start_lock = threading.Lock()
+        # One slot per worker, shared by batches and bulk calls
+        self._slots = threading.BoundedSemaphore(self.workers)
+        self._call_pool = None
+
+        # Metrics
+        self._stats_lock = threading.Lock()
+        self.batch_sizes = Counter()
+        self.items = 0
+        self.total_queue_wait = 0.0
+        self.max_queue_wait = 0.0
+        self.calls = 0
+
+    def submit(self, item):
+        """Queues one item and blocks until its result is ready."""
+        return self.submit_async(item).result()
+
+    def map(self, items):
+        """Queues several items at once so they can share batches, and returns their results in order."""
+        futures = [self.submit_async(item) for item in items]
+        return [future.result() for future in futures]
+
+    def submit_async(self, item):
+        """Queues one item and returns a Future for its result."""
+        self._ensure_workers()
+        future = Future()
+        self._queue.put((item, future, time.monotonic()))
+        return future
+
+    async def asubmit(self, item):
+        """Awaitable submit for async endpoints; the event loop is never blocked on inference."""
+        return await asyncio.wrap_future(self.submit_async(item))
+
+    async def amap(self, items):
+        """Awaitable map for async endpoints."""
+        futures = [asyncio.wrap_future(self.submit_async(item)) for item in items]
+        return list(await asyncio.gather(*futures))
+
+    def submit_call(self, fn, *args, **kwargs):
+        """
+        Runs fn(*args, **kwargs) as a single call that already holds a whole batch (such as
+        one encode over many texts), within this model's concurrency limit. Returns a Future.
+        """
+        with self._start_lock:
+            if self._call_pool is None:
+                self._call_pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"batcher-{self.name}-call")
+        return self._call_pool.submit(self._run_call, fn, args, kwargs)
+
+    def call(self, fn, *args, **kwargs):
+        """Blocking submit_call."""
+        return self.submit_call(fn, *args, **kwargs).result()
+
+    async def acall(self, fn, *args, **kwargs):
+        """Awaitable submit_call."""
+        return await asyncio.wrap_future(self.submit_call(fn, *args, **kwargs))
+
+    def _run_call(self, fn, args, kwargs):
+        with self._slots:
+            with self._stats_lock:
+                self.calls += 1
+            return fn(*args, **kwargs)
+
+    def _ensure_workers(self):
+        if not self._threads:
+            with self._start_lock:
+                if not self._threads:
+                    for i in range(self.workers):
+                        thread = threading.Thread(
+                            target=self._run, name=f"batcher-{self.name}-{i}", daemon=True)
+                        thread.start()
+                        self._threads.append(thread)
+
+    def _collect(self):
+        """
+        Waits for a first request, then gathers more until the batch is full or the window closes.
+        Requests whose future was cancelled meanwhile (e.g. an abandoned asubmit) are dropped;
+        the rest are marked running, so they can no longer be cancelled under the worker.
+        """
+        batch = []
+        self._take(batch, self._queue.get())
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                self._take(batch, self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    @staticmethod
+    def _take(batch, request):
+        if request[1].set_running_or_notify_cancel():
+            batch.append(request)
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if not batch:
+                continue
+            started = time.monotonic()
+            self._record(len(batch), [started - enqueued for _, _, enqueued in batch])
+
+            try:
+                with self._slots:
+                    results = self.process_batch([item for item, _, _ in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(f"{self.name} returned {len(results)} results for {len(batch)} inputs")
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+
+    def _record(self, size, waits):
+        with self._stats_lock:
+            self.batch_sizes[size] += 1
+            self.items += size
+            self.total_queue_wait += sum(waits)
+            self.max_queue_wait = max(self.max_queue_wait, max(waits))
+
+    def stats(self):
+        """Returns the batch-size distribution and queue wait metrics."""
+        with self._stats_lock:
+            batches = sum(self.batch_sizes.values())
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "workers": self.workers,
+                "batches": batches,
+                "items": self.items,
+                "batch_size_distribution": dict(sorted(self.batch_sizes.items())),
+                "avg_batch_size": self.items / batches if batches else 0,
+                "avg_queue_wait_ms": self.total_queue_wait / self.items * 1000 if self.items else 0,
+                "max_queue_wait_ms": self.max_queue_wait * 1000,
+                "bulk_calls": self.calls,
+                "queued": self._queue.qsize(),
+            }
+
+def get_batcher(name, process_batch, max_batch_size=None, max_wait_ms=None, workers=None):
+    """Returns the process-wide batcher with this name, creating it on first use."""
+    with _batchers_lock:
+        if name not in _batchers:
+            _batchers[name] = MicroBatcher(name, process_batch, max_batch_size, max_wait_ms, workers)
+        return _batchers[name]
+
+def as_list(result):
+    """HF pipelines unwrap single-element batches; always return a list."""
+    return result if isinstance(result, list) else [result]
+
+def get_batching_stats():
+    """Returns metrics for every batcher in this process."""
+    with _batchers_lock:
+        return {name: batcher.stats() for name, batcher in _batchers.items()}
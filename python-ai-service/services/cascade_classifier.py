@@ -0,0 +1,207 @@
+import os
+import time
+import threading
+import numpy as np
+from services.embedding_service import embedding_model, get_text_embedding
+
+# Tier 1 only answers when its top probability reaches this threshold; otherwise BART-MNLI runs
+CASCADE_ENABLED = os.getenv("CASCADE_ENABLED", "true").lower() == "true"
+CASCADE_THRESHOLD = float(os.getenv("CASCADE_THRESHOLD", "0.7"))
+# Softmax temperature over per-label cosine similarities (lower is sharper)
+CASCADE_TEMPERATURE = float(os.getenv("CASCADE_TEMPERATURE", "0.05"))
+# Number of nearest examples averaged per label
+CASCADE_NEIGHBORS = int(os.getenv("CASCADE_NEIGHBORS", "2"))
+
+# Example prompts used as label prototypes for the embedding tier
+LABEL_EXAMPLES = {
+    "research_analysis": [
+        "research the history of the printing press",
+        "gather information about renewable energy policy",
+        "investigate the causes of the 2008 financial crisis",
+    ],
+    "message_processing": [
+        "process my whatsapp messages",
+        "handle the new chat messages from the team",
+        "go through the messages I received today",
+    ],
+    "upload_file": [
+        "upload this document to my drive",
+        "save this file to the cloud",
+        "back up the presentation",
+    ],
+    "file_retrieval": [
+        "find the contract pdf I saved last week",
+        "get me the quarterly spreadsheet",
+        "open the document called project plan",
+    ],
+    "organize_files": [
+        "organize my documents into folders",
+        "clean up my drive",
+        "sort these files by date",
+    ],
+    "finance_analysis": [
+        "analyze my spending for this month",
+        "review my bank statement",
+        "how much did I spend on groceries",
+    ],
+    "send_email": [
+        "send an email to sarah about the meeting",
+        "write a message to my manager",
+        "draft an email to the client",
+    ],
+    "fetch_unread_emails": [
+        "check my inbox",
+        "do I have any new emails",
+        "show my unread messages",
+    ],
+    "summarize_emails": [
+        "summarize my emails from today",
+        "give me a digest of my inbox",
+        "what are the key points in my emails",
+    ],
+    "search_emails": [
+        "find the email from john about the invoice",
+        "search my mail for the flight confirmation",
+        "look up messages mentioning the budget",
+    ],
+    "meeting_scheduling": [
+        "schedule a meeting with the team tomorrow at 3pm",
+        "book a call with the recruiter",
+        "set up an appointment with my dentist",
+    ],
+    "fetch_upcoming_events": [
+        "what's on my calendar this week",
+        "do I have any meetings tomorrow",
+        "list my upcoming appointments",
+    ],
+    "market_research": [
+        "research the electric vehicle market",
+        "who are our main competitors",
+        "what are the trends in the fintech industry",
+    ],
+    "quick_answers": [
+        "what is the capital of japan",
+        "how does photosynthesis work",
+        "define inflation",
+    ],
+    "report_generation": [
+        "generate a monthly sales report",
+        "prepare a report on project progress",
+        "create an overview of last quarter's numbers",
+    ],
+    "progress_tracking": [
+        "how is the project going",
+        "track my progress on the thesis",
+        "give me a status update on my tasks",
+    ],
+    "health_reminders": [
+        "remind me to drink water every hour",
+        "set a reminder to take my medication",
+        "remind me to stretch in the afternoon",
+    ],
+}
+
+class EmbeddingPrototypeClassifier:
+    """
+    Cheap first tier of the task classifier: compares the MiniLM embedding of a
+    prompt with precomputed embeddings of example prompts per label, and turns
+    the mean similarity of each label's nearest examples into probabilities.
+    """
+
+    def __init__(self, label_examples, temperature=CASCADE_TEMPERATURE, neighbors=CASCADE_NEIGHBORS):
+        self.labels = list(label_examples)
+        self.label_examples = label_examples
+        self.temperature = temperature
+        self.neighbors = neighbors
+        self._prototypes = None
+        self._lock = threading.Lock()
+
+    def _ensure_prototypes(self):
+        """Encodes the examples once, on first use, into a (labels, examples, dim) tensor."""
+        if self._prototypes is None:
+            with self._lock:
+                if self._prototypes is None:
+                    per_label = max(len(examples) for examples in self.label_examples.values())
+                    texts = [example for label in self.labels for example in self.label_examples[label]]
+                    vectors = embedding_model.encode(texts, normalize_embeddings=True)
+                    prototypes = np.full((len(self.labels), per_label, vectors.shape[1]), np.nan, dtype=np.float32)
+                    row = 0
+                    for i, label in enumerate(self.labels):
+                        count = len(self.label_examples[label])
+                        prototypes[i, :count] = vectors[row:row + count]
+                        row += count
+                    self._prototypes = prototypes
+        return self._prototypes
+
+    def classify(self, text):
+        """Returns {"labels": [...], "scores": [...]} sorted by probability, like the zero-shot pipeline."""
+        prototypes = self._ensure_prototypes()
+        vector = np.asarray(get_text_embedding(text), dtype=np.float32)
+        vector /= max(float(np.linalg.norm(vector)), 1e-12)
+
+        # Similarity to every example; padding slots (NaN) never count as neighbours
+        similarities = np.nan_to_num(prototypes @ vector, nan=-1.0)
+        k = min(self.neighbors, similarities.shape[1])
+        label_scores = -np.sort(-similarities, axis=1)[:, :k].mean(axis=1)
+
+        logits = label_scores / self.temperature
+        probabilities = np.exp(logits - logits.max())
+        probabilities /= probabilities.sum()
+
+        order = np.argsort(-probabilities)
+        return {
+            "labels": [self.labels[i] for i in order],
+            "scores": [float(probabilities[i]) for i in order],
+        }
+
+class CascadeStats:
+    """Per-tier hit counts and latency for tuning the cascade threshold."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.tiers = {}
+
+    def record(self, tier, seconds):
+        with self._lock:
+            stats = self.tiers.setdefault(tier, {"hits": 0, "total_seconds": 0.0})
+            stats["hits"] += 1
+            stats["total_seconds"] += seconds
+
+    def snapshot(self):
+        with self._lock:
+            total = sum(stats["hits"] for stats in self.tiers.values())
+            return {
+                "enabled": CASCADE_ENABLED,
+                "threshold": CASCADE_THRESHOLD,
+                "tiers": {
+                    tier: {
+                        "hits": stats["hits"],
+                        "hit_rate": stats["hits"] / total if total else 0,
+                        "avg_latency_ms": stats["total_seconds"] / stats["hits"] * 1000,
+                    }
+                    for tier, stats in self.tiers.items()
+                },
+            }
+
+prototype_classifier = EmbeddingPrototypeClassifier(LABEL_EXAMPLES)
+cascade_stats = CascadeStats()
+
+def cascade_classify(text, nli_classify):
+    """
+    Runs the embedding tier first and falls back to nli_classify (BART-MNLI zero-shot)
+    only when the embedding tier's confidence is below CASCADE_THRESHOLD.
+    Tier latency for the fallback includes the time spent in the first tier.
+    """
+    started = time.perf_counter()
+    if CASCADE_ENABLED:
+        try:
+            result = prototype_classifier.classify(text)
+            if result["scores"][0] >= CASCADE_THRESHOLD:
+                cascade_stats.record("embedding", time.perf_counter() - started)
+                return result
+        except Exception as e:
+            print(f"Embedding classifier tier failed, falling back to NLI: {e}")
+
+    result = nli_classify(text)
+    cascade_stats.record("nli", time.perf_counter() - started)
+    return result
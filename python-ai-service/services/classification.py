@@ -1,7 +1,8 @@
-from transformers import pipeline
+from services.model_registry import acquire, ZERO_SHOT_CLASSIFIER
+from services.zero_shot import ZeroShotEngine
 
-classifier = pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
+classifier = acquire(*ZERO_SHOT_CLASSIFIER)
+domain_zero_shot = ZeroShotEngine(classifier, ["AI", "Cybersecurity", "Finance", "Healthcare"])
 
 def classify_text(text):
-    labels = ["AI", "Cybersecurity", "Finance", "Healthcare"]
-    return classifier(text, labels)["labels"][0]
+    return domain_zero_shot.classify(text)["labels"][0]
@@ -0,0 +1,9 @@
+import os
+
+# Where the service keeps its on-disk state (caches, ingest ledger); ignored by git
+DATA_DIR = os.getenv("AI_SERVICE_DATA_DIR") or os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".data")
+
+def data_path(name):
+    """Path of a file in the data directory, creating the directory on first use"""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    return os.path.join(DATA_DIR, name)
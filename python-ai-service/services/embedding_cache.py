@@ -0,0 +1,110 @@
+import sqlite3
+import hashlib
+import threading
+from array import array
+from collections import OrderedDict
+
+class EmbeddingCache:
+    """
+    Embedding cache keyed by model and text hash.
+    Entries live in a bounded in-memory LRU; when a path is given they are also
+    written to an SQLite store read through memory-mapped I/O, which survives
+    restarts and is shared by every worker on the host.
+    """
+
+    def __init__(self, model_name, max_entries=10000, path=None, mmap_bytes=256 * 1024 * 1024):
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.path = path
+        self.mmap_bytes = mmap_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if path:
+            self._connection().execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+
+    def _connection(self):
+        """SQLite connections cannot be shared across threads, so each thread opens its own."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA mmap_size={int(self.mmap_bytes)}")
+            self._local.conn = conn
+        return conn
+
+    def make_key(self, text):
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def _remember(self, key, packed):
+        with self._lock:
+            self._entries[key] = packed
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get(self, text):
+        """Returns the cached embedding for text as a list of floats, or None."""
+        key = self.make_key(text)
+        with self._lock:
+            packed = self._entries.get(key)
+            if packed is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return packed.tolist()
+
+        if self.path:
+            try:
+                row = self._connection().execute(
+                    "SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+            except sqlite3.Error as e:
+                print(f"Embedding cache read error: {e}")
+                row = None
+            if row:
+                packed = array("f")
+                packed.frombytes(row[0])
+                self._remember(key, packed)
+                with self._lock:
+                    self.disk_hits += 1
+                return packed.tolist()
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, text, vector):
+        """Stores an embedding as float32 in memory and, if enabled, on disk."""
+        key = self.make_key(text)
+        packed = array("f", vector)
+        self._remember(key, packed)
+
+        if self.path:
+            try:
+                self._connection().execute(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", (key, packed.tobytes()))
+            except sqlite3.Error as e:
+                print(f"Embedding cache write error: {e}")
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "model": self.model_name,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "persistent": bool(self.path),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": (self.hits + self.disk_hits) / lookups if lookups else 0,
+            }
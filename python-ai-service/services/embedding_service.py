@@ -1,8 +1,90 @@
-from sentence_transformers import SentenceTransformer
+import os
+import base64
+import numpy as np
+from services.batching import get_batcher
+from services.embedding_cache import EmbeddingCache
+from services.model_registry import acquire, SENTENCE_EMBEDDER
 
-# Load Embedding Model
-embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+# Load Embedding Model (shared with the QA knowledge base)
+embedding_model = acquire(*SENTENCE_EMBEDDER)
+
+# Shared cache of computed embeddings (set EMBEDDING_CACHE_PATH to persist across restarts)
+embedding_cache = EmbeddingCache(
+    SENTENCE_EMBEDDER[1],
+    max_entries=int(os.getenv("EMBEDDING_CACHE_SIZE", "10000")),
+    path=os.getenv("EMBEDDING_CACHE_PATH") or None,
+)
+
+# Texts per forward pass when a whole batch request is encoded at once
+ENCODE_BATCH_SIZE = int(os.getenv("EMBEDDING_ENCODE_BATCH_SIZE", "64"))
+# Output formats for batch requests; encoded ones are little-endian, row-major (texts x dimensions)
+EMBEDDING_FORMATS = ("json", "base64", "binary")
+# Precision of the returned values, for every format
+EMBEDDING_DTYPES = {"float32": "<f4", "float16": "<f2"}
+
+def _encode_batch(texts):
+    """Encodes a batch of texts in one forward pass."""
+    return embedding_model.encode(texts, batch_size=len(texts)).tolist()
+
+embedding_batcher = get_batcher("sentence-embedder", _encode_batch)
+
+def encode_texts(texts, batch_size=ENCODE_BATCH_SIZE):
+    """
+    Encodes many texts in one call as a float32 matrix. Runs through the embedder's
+    batcher, so bulk encodes count against the same per-model concurrency limit as batches.
+    """
+    return embedding_batcher.call(embedding_model.encode, texts, batch_size=batch_size, convert_to_numpy=True)
+
+async def encode_texts_async(texts, batch_size=ENCODE_BATCH_SIZE):
+    """Async variant of encode_texts that does not block the event loop."""
+    return await embedding_batcher.acall(embedding_model.encode, texts, batch_size=batch_size, convert_to_numpy=True)
 
 def get_text_embedding(text):
     """Generates embeddings for the given text for vector storage."""
-    return embedding_model.encode(text).tolist()
+    embedding = embedding_cache.get(text)
+    if embedding is None:
+        embedding = embedding_batcher.submit(text)
+        embedding_cache.put(text, embedding)
+    return embedding
+
+async def get_text_embedding_async(text):
+    """Async variant of get_text_embedding that does not block the event loop."""
+    embedding = embedding_cache.get(text)
+    if embedding is None:
+        embedding = await embedding_batcher.asubmit(text)
+        embedding_cache.put(text, embedding)
+    return embedding
+
+def get_text_embeddings(texts):
+    """
+    Embeds many texts as one float32 matrix (texts x dimensions). Cached texts are reused;
+    the rest, deduplicated, go to the model in a single encode call.
+    """
+    cached = [embedding_cache.get(text) for text in texts]
+    missing = list(dict.fromkeys(text for text, vector in zip(texts, cached) if vector is None))
+    computed = {}
+    if missing:
+        encoded = encode_texts(missing)
+        for text, vector in zip(missing, encoded):
+            computed[text] = vector
+            embedding_cache.put(text, vector)
+    return np.asarray([vector if vector is not None else computed[text] for text, vector in zip(texts, cached)],
+                      dtype=np.float32)
+
+def pack_embeddings(matrix, fmt="json", dtype="float32"):
+    """
+    Serializes an embedding matrix at the given precision for a JSON response: nested
+    float lists for "json", base64 of the raw little-endian bytes for "base64".
+    """
+    if fmt == "json":
+        values = np.asarray(matrix, dtype=EMBEDDING_DTYPES[dtype]).tolist()
+        return {"embeddings": values, "dtype": dtype, "shape": list(matrix.shape)}
+    return {
+        "embeddings": base64.b64encode(embedding_bytes(matrix, dtype)).decode("ascii"),
+        "dtype": dtype,
+        "shape": list(matrix.shape),
+    }
+
+def embedding_bytes(matrix, dtype="float32"):
+    """Raw row-major little-endian bytes of an embedding matrix"""
+    return np.ascontiguousarray(matrix, dtype=EMBEDDING_DTYPES[dtype]).tobytes()
@@ -0,0 +1,71 @@
+import os
+import time
+import asyncio
+from concurrent.futures.process import BrokenProcessPool
+from services.extract_event_details import extract_event_details
+from services.worker_pools import get_process_pool, discard_process_pool
+
+# Extraction is pure-Python and CPU-bound, so batches fan out over processes rather than threads
+EVENT_BATCH_WORKERS = int(os.getenv("EVENT_BATCH_WORKERS", str(os.cpu_count() or 1)))
+# Texts sent to a worker per task; amortizes pickling and IPC over several snippets
+EVENT_BATCH_CHUNK_SIZE = int(os.getenv("EVENT_BATCH_CHUNK_SIZE", "16"))
+# Batches at or below this size are extracted on a thread in this process; the IPC round trip would cost more
+EVENT_BATCH_INLINE_MAX = int(os.getenv("EVENT_BATCH_INLINE_MAX", "4"))
+
+def extract_chunk(texts):
+    """Runs in a worker: extracts each text, turning failures into per-item errors"""
+    results = []
+    for text in texts:
+        try:
+            results.append({"event": extract_event_details(text)})
+        except Exception as e:
+            results.append({"error": f"{type(e).__name__}: {e}"})
+    return results
+
+async def _run_chunk(texts):
+    pool = get_process_pool("event-extraction", EVENT_BATCH_WORKERS)
+    try:
+        return await asyncio.get_running_loop().run_in_executor(pool, extract_chunk, texts)
+    except BrokenProcessPool as e:
+        print(f"Event extraction worker died: {e}")
+        discard_process_pool("event-extraction", pool)
+        return [{"error": "worker process failed"} for _ in texts]
+
+async def extract_events_from_stream(texts):
+    """
+    Extracts events from an async stream of texts. Chunks are dispatched to the pool as
+    soon as they fill, so extraction overlaps reading the request. Results keep input order.
+    """
+    started = time.perf_counter()
+    tasks = []
+    pending = []
+
+    async for text in texts:
+        pending.append(text)
+        if len(pending) >= EVENT_BATCH_CHUNK_SIZE:
+            tasks.append(asyncio.ensure_future(_run_chunk(pending)))
+            pending = []
+    if pending:
+        if not tasks and len(pending) <= EVENT_BATCH_INLINE_MAX:
+            # Still off the event loop: a text that falls through to dateparser can take milliseconds
+            tasks.append(asyncio.get_running_loop().run_in_executor(None, extract_chunk, pending))
+        else:
+            tasks.append(asyncio.ensure_future(_run_chunk(pending)))
+
+    results = [item for chunk in await asyncio.gather(*tasks) for item in chunk]
+    for index, result in enumerate(results):
+        result["index"] = index
+
+    stats = {
+        "items": len(results),
+        "errors": sum(1 for result in results if "error" in result),
+        "elapsed_seconds": round(time.perf_counter() - started, 4),
+    }
+    return results, stats
+
+async def extract_events(texts):
+    """Extracts events from a list of texts; see extract_events_from_stream"""
+    async def iterate():
+        for text in texts:
+            yield text
+    return await extract_events_from_stream(iterate())
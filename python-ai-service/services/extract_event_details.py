@@ -1,14 +1,108 @@
 import re
+import calendar
+import threading
 import dateparser
+from collections import Counter
 from datetime import datetime, timedelta
+from dateparser.date import DateDataParser
+
+# ===== PRECOMPILED PATTERNS =====
+# Everything below is compiled once at import; extract_event_details only runs it.
+# Each pattern is still searched on its own rather than folded into one tokenizing pass:
+# every stage takes the first match of its pattern even where spans overlap (an hour inside
+# a date, a topic inside a description), which one non-overlapping pass can't reproduce, and
+# a combined alternation tries every branch at every position, so it costs about as much as
+# the handful of scans that actually run (see benchmarks/bench_event_extraction.py).
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+MONTHS = r'jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|jun(?:e)?|jul(?:y)?|aug(?:ust)?|sep(?:tember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?'
+
+# Most date, time and duration forms need a digit; texts without one skip those scans
+DIGIT = re.compile(r'\d')
+
+# Format: MM/DD or MM/DD/YYYY
+NUMERIC_DATE = re.compile(r'(\d{1,2}/\d{1,2}(?:/\d{2,4})?)', re.IGNORECASE)
+# Format: Month Day (Jan 15, January 15, Jan 15th, 2025)
+MONTH_DATE = re.compile(rf'({MONTHS})\s+(\d{{1,2}})(?:st|nd|rd|th)?(?:\s*(,)?\s*(\d{{2,4}}))?', re.IGNORECASE)
+
+# Relative date expressions, in priority order
+TODAY = re.compile(r'\b(?:today|tonight)\b')
+DAY_AFTER_TOMORROW = re.compile(r'\bday after tomorrow\b')
+TOMORROW = re.compile(r'\btomorrow\b')
+NEXT_DAY = re.compile(r'\bnext (?:week|monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b')
+NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+}
+RELATIVE_OFFSET = re.compile(rf'\bin (\d+|{"|".join(NUMBER_WORDS)}) (day|week|month)s?\b')
+
+# Words without which dateparser's full-text pass has nothing to find
+DATE_HINTS = re.compile(
+    rf'\d|\b(?:{MONTHS}|mon|tue|wed|thu|fri|sat|sun|now|yesterday|tonight|tomorrow|ago|noon|midnight'
+    r'|second|minute|hour|day|week|fortnight|month|year|decade)', re.IGNORECASE)
+
+# dateparser is only a last resort; restricting it to English skips language detection
+DATEPARSER_LANGUAGES = ["en"]
+FALLBACK_SETTINGS = {
+    "PREFER_DATES_FROM": "future",
+    "PREFER_DAY_OF_MONTH": "current",
+}
+MONTH_NUMBERS = {name: index for index, name in enumerate(calendar.month_abbr) if name}
+_date_data_parser = DateDataParser(languages=DATEPARSER_LANGUAGES)
+
+# Which stage resolved the date, and how often dateparser had to run
+_date_stats = Counter()
+_date_stats_lock = threading.Lock()
+
+def _count(stage):
+    with _date_stats_lock:
+        _date_stats[stage] += 1
+
+def get_date_parsing_stats():
+    """Counts of the stage that resolved each date, plus dateparser fallback calls"""
+    with _date_stats_lock:
+        return dict(_date_stats)
+
+# Any hour mention, used to decide whether a same-day weekday is already past
+HOUR_MENTION = re.compile(r'(\d{1,2})(?::(\d{2}))?\s*(am|pm)?', re.IGNORECASE)
+
+# 12-hour format (3pm, 3:30pm)
+TWELVE_HOUR_TIME = re.compile(r'(\d{1,2})(?::(\d{2}))?\s*(am|pm)', re.IGNORECASE)
+# 24-hour format (15:00)
+TWENTY_FOUR_HOUR_TIME = re.compile(r'(\d{2}):(\d{2})(?!\s*[ap]m)', re.IGNORECASE)
+# Words like "noon", "midnight"
+NAMED_TIME = re.compile(r'\b(noon|midnight)\b', re.IGNORECASE)
+
+TIME_PERIODS = (
+    (re.compile(r'\b(?:in the )?morning\b'), 9),
+    (re.compile(r'\b(?:in the )?afternoon\b'), 14),
+    (re.compile(r'\b(?:in the )?evening\b'), 18),
+    (re.compile(r'\b(?:at )?night\b'), 20),
+)
+
+# Specific duration (2 hours, 30 minutes)
+DURATION = re.compile(r'(?:for|lasting)?\s*(\d+)\s*(hour|hr|h|minute|min|m)s?')
+# All day event
+ALL_DAY = re.compile(r'\b(?:all[- ]?day|full[- ]?day)\b')
+
+EVENT_TYPE = re.compile(r'(meeting|call|appointment|interview|coffee|lunch|dinner|discussion|session|review|presentation|conference|webinar|workshop|class|lesson|training|demo|celebration)')
+
+PARTICIPANTS = re.compile(r'(?:with|and)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)')
+TOPIC = re.compile(r'(?:about|regarding|on|to discuss|for)\s+([a-zA-Z0-9\s]+?)(?=\s+(?:on|at|tomorrow|next|in|by)|\s*$)', re.IGNORECASE)
+NOUNS = re.compile(r'\b([A-Z][a-z]*(?:\s+[a-z]+)*)\b')
+
+DESCRIPTION_PATTERNS = (
+    re.compile(r'(?:about|regarding|to discuss|to talk about)\s+(.+?)(?=\s+(?:on|at|tomorrow|next|in|by)|\s*$)', re.IGNORECASE),
+    re.compile(r'(?:notes?|description|details?):\s*(.+?)(?=\s+(?:on|at|tomorrow|next|in|by)|\s*$)', re.IGNORECASE),
+)
 
 def extract_event_details(text):
     """
     Extracts event details from natural language input with improved accuracy.
-    
+
     Args:
         text (str): Natural language text describing an event
-        
+
     Returns:
         dict: Structured event details including summary, description, startTime, and endTime
     """
@@ -16,225 +110,71 @@ def extract_event_details(text):
     local_tz = datetime.now().astimezone().tzinfo
     now = datetime.now(local_tz)
     today = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    
+
     # ===== DATE EXTRACTION =====
     text_lower = text.lower()
-    parsed_date = None
-    
-    # Special pattern handling for common date formats
-    specific_date_patterns = [
-        # Format: MM/DD or MM/DD/YYYY
-        (r'(\d{1,2}/\d{1,2}(?:/\d{2,4})?)', lambda m: dateparser.parse(m.group(1))),
-        # Format: Month Day (Jan 15, January 15)
-        (r'(jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|jun(?:e)?|jul(?:y)?|aug(?:ust)?|sep(?:tember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\s+\d{1,2}(?:st|nd|rd|th)?(?:\s*,?\s*\d{2,4})?', 
-         lambda m: dateparser.parse(m.group(1))),
-    ]
-    
-    for pattern, parser_func in specific_date_patterns:
-        match = re.search(pattern, text_lower, re.IGNORECASE)
-        if match:
-            try:
-                parsed_date = parser_func(match)
-                if parsed_date:
-                    break
-            except:
-                continue
-    
+    has_digit = DIGIT.search(text_lower) is not None
+    parsed_date = _match_specific_date(text_lower, has_digit, today)
+
     # Handle common relative date expressions
     if not parsed_date:
-        relative_dates = {
-            r'\b(?:today|tonight)\b': lambda: today,
-            r'\btomorrow\b': lambda: today + timedelta(days=1),
-            r'\bday after tomorrow\b': lambda: today + timedelta(days=2),
-            r'\bnext (?:week|monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b': 
-                lambda: _handle_next_day(text_lower, today),
-            r'\bin (\d+) days?\b': lambda m: today + timedelta(days=int(m.group(1))),
-            r'\bin (\d+) weeks?\b': lambda m: today + timedelta(weeks=int(m.group(1))),
-            r'\bin (\d+) months?\b': lambda m: today.replace(month=(today.month + int(m.group(1)) - 1) % 12 + 1, 
-                                                year=today.year + (today.month + int(m.group(1)) - 1) // 12)
-        }
-        
-        for pattern, handler in relative_dates.items():
-            match = re.search(pattern, text_lower)
-            if match:
-                try:
-                    parsed_date = handler() if callable(handler) else handler(match)
-                    break
-                except:
-                    continue
-    
+        parsed_date = _match_relative_date(text_lower, today)
+        if parsed_date:
+            _count("relative")
+
     # Fallback to weekday detection if still no date
     if not parsed_date:
-        weekdays = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
-        for idx, day in enumerate(weekdays):
-            if day in text_lower:
-                days_ahead = (idx - today.weekday()) % 7
-                if days_ahead == 0:  # If today is the mentioned weekday
-                    # Check if past current time - if so, assume next week
-                    current_hour = now.hour
-                    time_pattern = r'(\d{1,2})(?::(\d{2}))?\s*(am|pm)?'
-                    time_match = re.search(time_pattern, text_lower, re.IGNORECASE)
-                    
-                    if time_match:
-                        hr = int(time_match.group(1))
-                        meridiem = time_match.group(3)
-                        if meridiem and meridiem.lower() == 'pm' and hr < 12:
-                            hr += 12
-                        if hr <= current_hour:
-                            days_ahead = 7
-                    else:
-                        # No specific time mentioned, assume next week
-                        days_ahead = 7
-                
-                parsed_date = today + timedelta(days=days_ahead)
-                break
-    
+        parsed_date = _match_weekday(text_lower, has_digit, now, today)
+        if parsed_date:
+            _count("weekday")
+
     # Last resort - use dateparser's general capabilities
-    if not parsed_date:
-        parsed_date = dateparser.parse(text, settings={
-            "PREFER_DATES_FROM": "future",
-            "PREFER_DAY_OF_MONTH": "current",
-            "RELATIVE_BASE": now
-        })
-    
+    if not parsed_date and DATE_HINTS.search(text_lower):
+        _count("dateparser_fallback_calls")
+        parsed_date = dateparser.parse(text, languages=DATEPARSER_LANGUAGES,
+                                       settings={**FALLBACK_SETTINGS, "RELATIVE_BASE": now})
+        if parsed_date:
+            _count("dateparser_fallback")
+
     # If still no date, default to tomorrow
     if not parsed_date:
+        _count("default")
         parsed_date = today + timedelta(days=1)
-    
+
     # Ensure we're working with a timezone-aware datetime
     if parsed_date.tzinfo is None:
         parsed_date = parsed_date.replace(tzinfo=local_tz)
-    
+
     # ===== TIME EXTRACTION =====
-    # Look for specific time patterns
-    time_patterns = [
-        # 12-hour format (3pm, 3:30pm)
-        r'(\d{1,2})(?::(\d{2}))?\s*(am|pm)',
-        # 24-hour format (15:00)
-        r'(\d{2}):(\d{2})(?!\s*[ap]m)',
-        # Words like "noon", "midnight"
-        r'\b(noon|midnight)\b',
-        # Time ranges (from X to Y)
-        r'(?:from|between)?\s*(\d{1,2})(?::(\d{2}))?\s*(am|pm)?\s*(?:to|until|till|-)\s*(\d{1,2})(?::(\d{2}))?\s*(am|pm)'
-    ]
-    
-    found_time = False
-    for pattern in time_patterns:
-        time_match = re.search(pattern, text_lower, re.IGNORECASE)
-        if time_match:
-            if "noon" in time_match.group(0):
-                parsed_date = parsed_date.replace(hour=12, minute=0)
-            elif "midnight" in time_match.group(0):
-                parsed_date = parsed_date.replace(hour=0, minute=0)
-            elif "to" in pattern or "until" in pattern or "till" in pattern or "-" in pattern:
-                # Handle time ranges - extract start time
-                hour = int(time_match.group(1))
-                minute = int(time_match.group(2)) if time_match.group(2) else 0
-                meridiem = time_match.group(3).lower() if time_match.group(3) else None
-                
-                if meridiem == 'pm' and hour < 12:
-                    hour += 12
-                elif meridiem == 'am' and hour == 12:
-                    hour = 0
-                    
-                parsed_date = parsed_date.replace(hour=hour, minute=minute, second=0, microsecond=0)
-            else:
-                # Standard time format
-                hour = int(time_match.group(1))
-                minute = int(time_match.group(2)) if time_match.group(2) else 0
-                meridiem = time_match.group(3).lower() if time_match.group(3) else None
-                
-                if meridiem == 'pm' and hour < 12:
-                    hour += 12
-                elif meridiem == 'am' and hour == 12:
-                    hour = 0
-                    
-                parsed_date = parsed_date.replace(hour=hour, minute=minute, second=0, microsecond=0)
-            
-            found_time = True
-            break
-    
+    parsed_date, found_time = _apply_time(text_lower, has_digit, parsed_date)
+
     # If no specific time found, check for time periods
     if not found_time:
-        time_periods = {
-            r'\b(?:in the )?morning\b': 9,
-            r'\b(?:in the )?afternoon\b': 14,
-            r'\b(?:in the )?evening\b': 18,
-            r'\b(?:at )?night\b': 20
-        }
-        
-        for pattern, hour in time_periods.items():
-            if re.search(pattern, text_lower):
+        for pattern, hour in TIME_PERIODS:
+            if pattern.search(text_lower):
                 parsed_date = parsed_date.replace(hour=hour, minute=0, second=0, microsecond=0)
                 found_time = True
                 break
-    
+
     # Default to 9 AM if no time specified
     if not found_time:
         parsed_date = parsed_date.replace(hour=9, minute=0, second=0, microsecond=0)
-    
+
     # ===== DURATION EXTRACTION =====
-    # Advanced duration extraction
-    duration_patterns = [
-        # Specific duration (2 hours, 30 minutes)
-        r'(?:for|lasting)?\s*(\d+)\s*(hour|hr|h|minute|min|m)s?',
-        # Combined duration (1 hour and 30 minutes)
-        r'(?:for|lasting)?\s*(\d+)\s*(hour|hr|h)s?\s*(?:and)?\s*(\d+)\s*(minute|min|m)s?',
-        # All day event
-        r'\b(?:all[- ]?day|full[- ]?day)\b'
-    ]
-    
-    duration = timedelta(hours=1)  # Default duration
-    
-    for pattern in duration_patterns:
-        duration_match = re.search(pattern, text_lower)
-        if duration_match:
-            if "all-day" in pattern or "full-day" in pattern or (duration_match and ("all-day" in duration_match.group(0) or "full-day" in duration_match.group(0))):
-                # All-day event: set to end at 6 PM if starts in morning
-                if parsed_date.hour < 12:
-                    duration = timedelta(hours=9)  # 9 AM to 6 PM
-                else:
-                    duration = timedelta(hours=3)  # Whatever time to +3 hours
-            elif "and" in pattern or (len(duration_match.groups()) >= 4):
-                # Combined format: X hours and Y minutes
-                hours = int(duration_match.group(1))
-                minutes = int(duration_match.group(3))
-                duration = timedelta(hours=hours, minutes=minutes)
-            else:
-                # Simple duration
-                value = int(duration_match.group(1))
-                unit = duration_match.group(2).lower()
-                
-                if unit.startswith(('m', 'min')):
-                    duration = timedelta(minutes=value)
-                else:
-                    duration = timedelta(hours=value)
-            break
-    
+    duration = _match_duration(text_lower, has_digit, parsed_date)
+
     # ===== SUMMARY/TITLE EXTRACTION =====
     # First look for common event types
-    event_type_patterns = [
-        r'(meeting|call|appointment|interview|coffee|lunch|dinner|discussion|session|review|presentation|conference|webinar|workshop|class|lesson|training|demo|celebration)',
-        r'(\w+)\s+(meeting|call|appointment|session)'
-    ]
-    
-    event_type = None
-    for pattern in event_type_patterns:
-        event_match = re.search(pattern, text_lower)
-        if event_match:
-            event_type = event_match.group(1).strip()
-            break
-    
+    event_match = EVENT_TYPE.search(text_lower)
+    event_type = event_match.group(1).strip() if event_match else None
+
     # Look for participants or topics
-    participant_pattern = r'(?:with|and)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)'
-    topic_pattern = r'(?:about|regarding|on|to discuss|for)\s+([a-zA-Z0-9\s]+?)(?=\s+(?:on|at|tomorrow|next|in|by)|\s*$)'
-    
-    participant_match = re.search(participant_pattern, text)
-    topic_match = re.search(topic_pattern, text, re.IGNORECASE)
-    
+    participant_match = PARTICIPANTS.search(text)
+    topic_match = TOPIC.search(text)
+
     participants = participant_match.group(1) if participant_match else ""
     topic = topic_match.group(1) if topic_match else ""
-    
+
     # Construct a meaningful summary
     if event_type and participants:
         summary = f"{event_type.title()} with {participants}"
@@ -248,30 +188,24 @@ def extract_event_details(text):
         summary = f"Meeting with {participants}"
     else:
         # Fallback to extracting nouns as potential summary
-        nouns_pattern = r'\b([A-Z][a-z]*(?:\s+[a-z]+)*)\b'
-        nouns = re.findall(nouns_pattern, text)
-        if nouns and len(nouns[0]) > 3:  # Ensure it's meaningful
-            summary = nouns[0]
+        noun_match = NOUNS.search(text)
+        if noun_match and len(noun_match.group(1)) > 3:  # Ensure it's meaningful
+            summary = noun_match.group(1)
         else:
             summary = "Scheduled Event"
-    
+
     # ===== DESCRIPTION EXTRACTION =====
     description = ""
-    desc_patterns = [
-        r'(?:about|regarding|to discuss|to talk about)\s+(.+?)(?=\s+(?:on|at|tomorrow|next|in|by)|\s*$)',
-        r'(?:notes?|description|details?):\s*(.+?)(?=\s+(?:on|at|tomorrow|next|in|by)|\s*$)'
-    ]
-    
-    for pattern in desc_patterns:
-        desc_match = re.search(pattern, text, re.IGNORECASE)
+    for pattern in DESCRIPTION_PATTERNS:
+        desc_match = pattern.search(text)
         if desc_match:
             description = desc_match.group(1).strip()
             break
-    
+
     # Format and return response
     start_time = parsed_date.isoformat()
     end_time = (parsed_date + duration).isoformat()
-    
+
     return {
         "summary": summary,
         "description": description,
@@ -279,25 +213,188 @@ def extract_event_details(text):
         "endTime": end_time,
     }
 
+def _match_specific_date(text_lower, has_digit, today):
+    """
+    Explicit dates: MM/DD[/YYYY] first, then Month Day[, Year]. Parsed natively;
+    dateparser only sees the matched span when the native parse can't make sense of it.
+    """
+    if not has_digit:
+        return None
+
+    candidates = (
+        (NUMERIC_DATE.search(text_lower), _parse_numeric_date, "numeric_date"),
+        (MONTH_DATE.search(text_lower), _parse_month_date, "month_date"),
+    )
+    for match, parse, stage in candidates:
+        if not match:
+            continue
+        parsed_date = parse(match, today)
+        if parsed_date:
+            _count(stage)
+            return parsed_date
+
+        _count("dateparser_span_calls")
+        try:
+            parsed_date = _date_data_parser.get_date_data(match.group(0)).date_obj
+        except Exception:
+            continue
+        if parsed_date:
+            _count("dateparser_span")
+            return parsed_date
+    return None
+
+def _expand_year(year, today):
+    """Two-digit years follow the strptime convention (69-99 -> 1900s, 00-68 -> 2000s)"""
+    if year is None:
+        return today.year
+    year = int(year)
+    if year < 100:
+        year += 1900 if year >= 69 else 2000
+    return year
+
+def _safe_date(today, year, month, day, explicit_year):
+    """Builds the date, or None if it doesn't exist; yearless dates already past roll into next year"""
+    try:
+        parsed_date = today.replace(year=year, month=month, day=day)
+        if not explicit_year and parsed_date < today:
+            parsed_date = parsed_date.replace(year=year + 1)
+        return parsed_date
+    except ValueError:
+        return None
+
+def _parse_numeric_date(match, today):
+    """MM/DD[/YY[YY]], read as DD/MM when the first number can't be a month"""
+    parts = match.group(1).split("/")
+    first, second = int(parts[0]), int(parts[1])
+    month, day = (second, first) if first > 12 >= second else (first, second)
+    year = parts[2] if len(parts) > 2 else None
+    return _safe_date(today, _expand_year(year, today), month, day, year is not None)
+
+def _parse_month_date(match, today):
+    """Month Day[, Year]; a trailing two-digit number only counts as a year after a comma"""
+    month = MONTH_NUMBERS[match.group(1)[:3].title()]
+    day = int(match.group(2))
+    year = match.group(4)
+    if year and len(year) != 4 and not match.group(3):
+        year = None
+    return _safe_date(today, _expand_year(year, today), month, day, year is not None)
+
+def _match_relative_date(text_lower, today):
+    """today/tonight, tomorrow, day after tomorrow, next <weekday|week>, in N days/weeks/months"""
+    if TODAY.search(text_lower):
+        return today
+    if DAY_AFTER_TOMORROW.search(text_lower):
+        return today + timedelta(days=2)
+    if TOMORROW.search(text_lower):
+        return today + timedelta(days=1)
+    if NEXT_DAY.search(text_lower):
+        return _handle_next_day(text_lower, today)
+
+    match = RELATIVE_OFFSET.search(text_lower)
+    if match:
+        amount = NUMBER_WORDS.get(match.group(1)) or int(match.group(1))
+        try:
+            return _offset_date(today, amount, match.group(2))
+        except (OverflowError, ValueError):
+            # Offsets past datetime's range (year 9999) aren't dates; let the later stages try
+            return None
+    return None
+
+def _offset_date(today, amount, unit):
+    if unit == "day":
+        return today + timedelta(days=amount)
+    if unit == "week":
+        return today + timedelta(weeks=amount)
+    # Months: clamp the day so Jan 31 + 1 month lands on the last day of February
+    month_index = today.month - 1 + amount
+    year, month = today.year + month_index // 12, month_index % 12 + 1
+    day = min(today.day, calendar.monthrange(year, month)[1])
+    return today.replace(year=year, month=month, day=day)
+
+def _match_weekday(text_lower, has_digit, now, today):
+    """Upcoming occurrence of the first weekday (Monday first) mentioned in the text"""
+    for idx, day in enumerate(WEEKDAYS):
+        if day in text_lower:
+            days_ahead = (idx - today.weekday()) % 7
+            if days_ahead == 0:  # If today is the mentioned weekday
+                # Check if past current time - if so, assume next week
+                time_match = HOUR_MENTION.search(text_lower) if has_digit else None
+
+                if time_match:
+                    hr = int(time_match.group(1))
+                    meridiem = time_match.group(3)
+                    if meridiem and meridiem.lower() == 'pm' and hr < 12:
+                        hr += 12
+                    if hr <= now.hour:
+                        days_ahead = 7
+                else:
+                    # No specific time mentioned, assume next week
+                    days_ahead = 7
+
+            return today + timedelta(days=days_ahead)
+    return None
+
+def _apply_time(text_lower, has_digit, parsed_date):
+    """Sets the time of day from an explicit time; returns (date, whether a time was found)"""
+    clock_matches = (TWELVE_HOUR_TIME, TWENTY_FOUR_HOUR_TIME) if has_digit else ()
+    for pattern in clock_matches:
+        time_match = pattern.search(text_lower)
+        if time_match:
+            hour = int(time_match.group(1))
+            minute = int(time_match.group(2)) if time_match.group(2) else 0
+            meridiem = time_match.group(3).lower() if pattern.groups >= 3 and time_match.group(3) else None
+
+            if meridiem == 'pm' and hour < 12:
+                hour += 12
+            elif meridiem == 'am' and hour == 12:
+                hour = 0
+
+            return parsed_date.replace(hour=hour, minute=minute, second=0, microsecond=0), True
+
+    time_match = NAMED_TIME.search(text_lower)
+    if time_match:
+        if time_match.group(1) == "noon":
+            return parsed_date.replace(hour=12, minute=0), True
+        return parsed_date.replace(hour=0, minute=0), True
+
+    return parsed_date, False
+
+def _match_duration(text_lower, has_digit, parsed_date):
+    """Event length from an explicit duration or an all-day marker; defaults to one hour"""
+    duration_match = DURATION.search(text_lower) if has_digit else None
+    if duration_match:
+        value = int(duration_match.group(1))
+        unit = duration_match.group(2).lower()
+
+        if unit.startswith(('m', 'min')):
+            return timedelta(minutes=value)
+        return timedelta(hours=value)
+
+    if ALL_DAY.search(text_lower):
+        # All-day event: set to end at 6 PM if starts in morning
+        if parsed_date.hour < 12:
+            return timedelta(hours=9)  # 9 AM to 6 PM
+        return timedelta(hours=3)  # Whatever time to +3 hours
+
+    return timedelta(hours=1)  # Default duration
+
 # Helper function for next day calculation
 def _handle_next_day(text, today):
-    weekdays = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
-    
-    for idx, day in enumerate(weekdays):
+    for idx, day in enumerate(WEEKDAYS):
         if f"next {day}" in text:
             # "Next Monday" means the Monday after this week's Monday
             current_weekday = today.weekday()
             target_weekday = idx
-            
+
             if target_weekday <= current_weekday:
                 days_ahead = 7 + (target_weekday - current_weekday)
             else:
                 days_ahead = target_weekday - current_weekday
-            
+
             return today + timedelta(days=days_ahead)
-    
+
     # Generic "next week" means 7 days from today
     if "next week" in text:
         return today + timedelta(days=7)
-    
-    return None
\ No newline at end of file
+
+    return None
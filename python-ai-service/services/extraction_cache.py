@@ -0,0 +1,135 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from services.data_dir import data_path
+
+HASH_CHUNK_BYTES = 1024 * 1024
+
+def file_digest(fileobj):
+    """SHA-256 of a binary file object, read in chunks from the start; leaves it rewound"""
+    digest = hashlib.sha256()
+    fileobj.seek(0)
+    for chunk in iter(lambda: fileobj.read(HASH_CHUNK_BYTES), b""):
+        digest.update(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+class ExtractionCache:
+    """
+    Disk-backed cache of extracted document text, keyed by a hash of the file bytes plus the
+    extractor version and options. Stored in SQLite (WAL, memory-mapped reads) so it survives
+    restarts and is shared by every worker on the host; the least recently used entries are
+    evicted once the stored text exceeds max_bytes.
+    """
+
+    def __init__(self, path, max_bytes=256 * 1024 * 1024, mmap_bytes=64 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.mmap_bytes = mmap_bytes
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if path:
+            conn = self._connection()
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS extractions "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS extractions_last_used ON extractions (last_used)")
+
+    def _connection(self):
+        """SQLite connections cannot be shared across threads, so each thread opens its own."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA mmap_size={int(self.mmap_bytes)}")
+            self._local.conn = conn
+        return conn
+
+    def make_key(self, fileobj, extractor, options=""):
+        """Key for a file as processed by `extractor` (a name and version) with the given options"""
+        return hashlib.sha256(f"{extractor}\0{options}\0{file_digest(fileobj)}".encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Returns the cached text, or None."""
+        if not self.path:
+            return None
+        try:
+            conn = self._connection()
+            row = conn.execute("SELECT value FROM extractions WHERE key = ?", (key,)).fetchone()
+            if row:
+                conn.execute("UPDATE extractions SET last_used = ? WHERE key = ?", (time.time(), key))
+        except sqlite3.Error as e:
+            print(f"Extraction cache read error: {e}")
+            row = None
+        with self._lock:
+            if row:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return row[0] if row else None
+
+    def put(self, key, value):
+        """Stores extracted text, then evicts least recently used entries beyond max_bytes."""
+        if not self.path:
+            return
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        try:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO extractions (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time()))
+            self._evict(conn)
+        except sqlite3.Error as e:
+            print(f"Extraction cache write error: {e}")
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM extractions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in conn.execute("SELECT key, size FROM extractions ORDER BY last_used").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM extractions WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        with self._lock:
+            self.evictions += evicted
+
+    def stats(self):
+        stored = {"entries": 0, "bytes": 0}
+        if self.path:
+            try:
+                entries, size = self._connection().execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM extractions").fetchone()
+                stored = {"entries": entries, "bytes": size}
+            except sqlite3.Error as e:
+                print(f"Extraction cache read error: {e}")
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": bool(self.path),
+                **stored,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0,
+            }
+
+# Shared by the PDF and image extractors; holds document text, so it lives in the data directory
+# (set EXTRACTION_CACHE_PATH to "" to disable)
+extraction_cache = ExtractionCache(
+    path=os.getenv("EXTRACTION_CACHE_PATH", data_path("extraction_cache.sqlite")) or None,
+    max_bytes=int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+)
@@ -1,8 +1,28 @@
-import pytesseract
 from PIL import Image
 import io
+from services.ocr import ocr_image, ocr_version
+from services.extraction_cache import extraction_cache
+from services.upload_limits import upload_budget, upload_size
 
-def extract_text_from_image(image_bytes):
+def decoded_size(image):
+    """Bytes the decoded pixels will take, read from the header before anything is decoded"""
+    width, height = image.size
+    return width * height * len(image.getbands())
+
+def extract_text_from_image(image_file):
     """Extracts text from an image using OCR."""
-    image = Image.open(io.BytesIO(image_bytes))
-    return pytesseract.image_to_string(image)
+    if isinstance(image_file, (bytes, bytearray)):
+        image_file = io.BytesIO(image_file)
+    # A re-upload of the same file is answered from the cache without opening the image
+    cache_key = extraction_cache.make_key(image_file, f"image:{ocr_version()}")
+    cached = extraction_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Image.open only parses the header; the spooled upload is decoded in place, never copied to bytes
+    image = Image.open(image_file)
+    # Decoding plus the preprocessed grayscale copy and strips handed to tesseract: count the pixels twice
+    with upload_budget.reserve(upload_size(image_file) + 2 * decoded_size(image)):
+        text = ocr_image(image)
+    extraction_cache.put(cache_key, text)
+    return text
@@ -1,8 +1,10 @@
-from transformers import pipeline
+from services.model_registry import acquire, ZERO_SHOT_CLASSIFIER
+from services.zero_shot import ZeroShotEngine
 
-classifier = pipeline("text-classification", model="facebook/bart-large-mnli")
+# Shares the zero-shot BART-MNLI pipeline with the task classifier
+classifier = acquire(*ZERO_SHOT_CLASSIFIER)
+intent_zero_shot = ZeroShotEngine(classifier, ["summarize", "schedule_meeting", "fetch_files", "general_query"])
 
 def classify_intent(text):
-    labels = ["summarize", "schedule_meeting", "fetch_files", "general_query"]
-    result = classifier(text, labels)
+    result = intent_zero_shot.classify(text)
     return result["labels"][0]
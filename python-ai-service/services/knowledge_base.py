@@ -0,0 +1,225 @@
+import os
+import re
+import json
+import time
+import asyncio
+import hashlib
+import threading
+import unicodedata
+from services.embedding_service import encode_texts_async
+from services.quick_answers import get_embedding, invalidate_answer_caches
+from services.vector_store import vector_store, upsert_vectors
+from services.data_dir import data_path
+
+# Bulk ingestion tuning
+EMBED_BATCH_SIZE = int(os.getenv("KB_EMBED_BATCH_SIZE", "64"))
+UPSERT_CHUNK_SIZE = int(os.getenv("KB_UPSERT_CHUNK_SIZE", "100"))
+UPSERT_PARALLELISM = int(os.getenv("KB_UPSERT_PARALLELISM", "4"))
+# NDJSON streams are ingested in windows of this many items
+STREAM_WINDOW = int(os.getenv("KB_STREAM_WINDOW", "512"))
+# Append-only record of IDs already upserted to Pinecone, shared by all workers on the host.
+# Local stores answer from their own contents instead, since they are per-process.
+# One ledger per index; clearPineCone.js deletes it along with the index's vectors
+# (delete the file by hand after emptying the index any other way).
+INGESTED_IDS_PATH = (os.getenv("KB_INGESTED_IDS_PATH")
+                     or data_path(f"kb_ingested_ids.{os.getenv('PINECONE_INDEX') or 'default'}"))
+
+def normalize_text(text):
+    """Normalizes unicode form and whitespace so trivially different copies hash the same"""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+def make_item_id(text):
+    """Generate a stable, content-addressed ID for a knowledge base entry (SHA-256 of the normalized text)"""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+class IngestedIds:
+    """
+    Set of already-ingested IDs backed by an append-only file.
+    Lines appended by other workers are picked up on the next lookup, and a file that is
+    deleted or truncated (the ledger was reset) empties the set.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._ids = set()
+        self._offset = 0
+        self._file = None
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        if not self.path:
+            return
+        # A missing, replaced or truncated file means the ledger was reset; forget what it held
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._ids.clear()
+            self._offset = 0
+            return
+        if (stat.st_dev, stat.st_ino) != self._file or stat.st_size < self._offset:
+            self._ids.clear()
+            self._offset = 0
+            self._file = (stat.st_dev, stat.st_ino)
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read()
+        # Only consume complete lines; a concurrent writer may be mid-line
+        complete = data[:data.rfind(b"\n") + 1]
+        self._offset += len(complete)
+        self._ids.update(line for line in complete.decode("utf-8").split("\n") if line)
+
+    def filter_new(self, ids):
+        """Returns the subset of ids that have not been ingested yet"""
+        with self._lock:
+            self._refresh()
+            return {item_id for item_id in ids if item_id not in self._ids}
+
+    def add(self, ids):
+        """Records ids as ingested"""
+        with self._lock:
+            self._refresh()
+            new_ids = [item_id for item_id in ids if item_id not in self._ids]
+            self._ids.update(new_ids)
+            if self.path and new_ids:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write("".join(f"{item_id}\n" for item_id in new_ids))
+
+# Only persisted for Pinecone; IDs recorded against a local store would wrongly skip a later Pinecone ingest
+ingested_ids = IngestedIds(INGESTED_IDS_PATH if vector_store.name == "pinecone" else None)
+
+def filter_new_ids(ids):
+    """
+    Returns the ids not yet in the vector store. Stores that can answer directly (local,
+    mirrored) are asked; only the shared Pinecone index relies on the ingested-ids ledger.
+    """
+    held = vector_store.contains(ids)
+    if held is None:
+        return ingested_ids.filter_new(ids)
+    return set(ids) - held
+
+def _build_metadata(text, metadata):
+    """Create metadata (including the full text for retrieval)"""
+    metadata = dict(metadata or {})
+    metadata["text"] = text
+    return metadata
+
+async def add_item(text, metadata=None):
+    """
+    Embeds one text and upserts it to the vector store, returning its ID and whether it was skipped.
+    Unchanged texts that were already ingested skip both the embedding and the upsert.
+    """
+    item_id = make_item_id(text)
+    if not filter_new_ids([item_id]):
+        return item_id, True
+
+    vector = await get_embedding(text)
+    await upsert_vectors([(item_id, vector, _build_metadata(text, metadata))])
+    ingested_ids.add([item_id])
+    invalidate_answer_caches()
+    return item_id, False
+
+async def add_items(items):
+    """
+    Embeds many (text, metadata) items in batches and upserts them in chunks
+    with bounded parallelism. Returns the item IDs in input order plus timing stats.
+    Items already ingested, or repeated within the batch, are skipped.
+    """
+    started = time.perf_counter()
+    ids = [make_item_id(text) for text, _ in items]
+
+    new_ids = filter_new_ids(ids)
+    pending = {}
+    for item_id, item in zip(ids, items):
+        if item_id in new_ids and item_id not in pending:
+            pending[item_id] = item
+
+    stats = {"items": len(items), "skipped": len(items) - len(pending)}
+    if not pending:
+        return ids, {**stats, "embed_seconds": 0.0, "upsert_seconds": 0.0, "elapsed_seconds": 0.0}
+
+    texts = [text for text, _ in pending.values()]
+
+    # Bulk encode off the event loop, within the embedder's concurrency limit; one call lets the model batch internally
+    vectors = (await encode_texts_async(texts, batch_size=EMBED_BATCH_SIZE)).tolist()
+    embedded = time.perf_counter()
+
+    records = [
+        (item_id, vector, _build_metadata(text, metadata))
+        for (item_id, (text, metadata)), vector in zip(pending.items(), vectors)
+    ]
+
+    semaphore = asyncio.Semaphore(UPSERT_PARALLELISM)
+
+    async def upsert_chunk(chunk):
+        async with semaphore:
+            await upsert_vectors(chunk)
+            ingested_ids.add([item_id for item_id, _, _ in chunk])
+
+    await asyncio.gather(*(
+        upsert_chunk(records[i:i + UPSERT_CHUNK_SIZE])
+        for i in range(0, len(records), UPSERT_CHUNK_SIZE)
+    ))
+    # Cached answers may be stale now that retrieval can find new context
+    invalidate_answer_caches()
+    finished = time.perf_counter()
+
+    return ids, {
+        **stats,
+        "embed_seconds": round(embedded - started, 4),
+        "upsert_seconds": round(finished - embedded, 4),
+        "elapsed_seconds": round(finished - started, 4),
+    }
+
+def parse_ndjson_line(line):
+    """Parses one NDJSON line into a (text, metadata) item, or None for blank lines"""
+    line = line.strip()
+    if not line:
+        return None
+    record = json.loads(line)
+    if not isinstance(record, dict) or not isinstance(record.get("text"), str):
+        raise ValueError("each NDJSON line must be an object with a 'text' string")
+    return record["text"], record.get("metadata")
+
+async def iter_ndjson_items(chunks):
+    """Yields (text, metadata) items from an async stream of NDJSON byte chunks"""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            item = parse_ndjson_line(line.decode("utf-8"))
+            if item:
+                yield item
+    item = parse_ndjson_line(buffer.decode("utf-8"))
+    if item:
+        yield item
+
+async def add_items_from_stream(items):
+    """Ingests an async stream of items window by window so the whole stream is never held in memory"""
+    started = time.perf_counter()
+    ids = []
+    stats = {"items": 0, "skipped": 0, "embed_seconds": 0.0, "upsert_seconds": 0.0}
+
+    async def flush(window):
+        window_ids, window_stats = await add_items(window)
+        ids.extend(window_ids)
+        for key in stats:
+            stats[key] += window_stats[key]
+
+    window = []
+    async for item in items:
+        window.append(item)
+        if len(window) >= STREAM_WINDOW:
+            await flush(window)
+            window = []
+    if window:
+        await flush(window)
+
+    stats["elapsed_seconds"] = time.perf_counter() - started
+    return ids, {key: round(value, 4) if isinstance(value, float) else value for key, value in stats.items()}
+
+def with_throughput(stats):
+    """Adds an items-per-second figure to ingestion stats"""
+    elapsed = stats["elapsed_seconds"]
+    stats["items_per_second"] = round(stats["items"] / elapsed, 2) if elapsed else None
+    return stats
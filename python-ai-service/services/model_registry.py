@@ -0,0 +1,140 @@
+import os
+import threading
+from collections import Counter
+
+# Shared model identifiers, as (task, model name)
+SUMMARIZER = ("summarization", "facebook/bart-large-cnn")
+ZERO_SHOT_CLASSIFIER = ("zero-shot-classification", "facebook/bart-large-mnli")
+EXTRACTIVE_QA = ("question-answering", "deepset/roberta-base-squad2")
+LIGHT_EXTRACTIVE_QA = ("question-answering", "distilbert-base-cased-distilled-squad")
+GENERAL_QA = ("text2text-generation", "google/flan-t5-base")
+SENTENCE_EMBEDDER = ("sentence-embedding", "all-MiniLM-L6-v2")
+
+# Models that no endpoint depends on are only loaded when explicitly enabled
+LOAD_OPTIONAL_MODELS = os.getenv("LOAD_OPTIONAL_MODELS", "false").lower() == "true"
+
+# Process-wide store of loaded models, keyed by (task, model name). Models stay loaded for the
+# life of the process; handles are counted only to report which modules use each model.
+_models = {}
+_handles = Counter()
+_load_counts = Counter()
+_loading = set()
+_load_errors = {}
+_key_locks = {}
+_lock = threading.RLock()
+
+class LazyModel:
+    """Handle to a shared model that is only loaded on first use."""
+
+    def __init__(self, task, model_name):
+        self.key = (task, model_name)
+
+    def __call__(self, *args, **kwargs):
+        return get_model(*self.key)(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(get_model(*self.key), name)
+
+    @property
+    def loaded(self):
+        return self.key in _models
+
+def _load(task, model_name):
+    """Builds the model object for a task; sentence embedders are not transformers pipelines."""
+    if task == "sentence-embedding":
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name)
+
+    from transformers import pipeline
+    return pipeline(task, model=model_name)
+
+def get_model(task, model_name):
+    """Returns the shared model for a task/model pair, loading it only once per process."""
+    key = (task, model_name)
+    model = _models.get(key)
+    if model is not None:
+        return model
+
+    # Loading holds a per-model lock so status checks and other models are not blocked
+    with _lock:
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+
+    with key_lock:
+        # Another thread may have finished loading while we waited for the lock
+        if key not in _models:
+            with _lock:
+                _loading.add(key)
+            try:
+                model = _load(task, model_name)
+            except Exception as e:
+                with _lock:
+                    _load_errors[key] = str(e)
+                raise
+            finally:
+                with _lock:
+                    _loading.discard(key)
+
+            with _lock:
+                _models[key] = model
+                _load_counts[key] += 1
+                _load_errors.pop(key, None)
+        return _models[key]
+
+def acquire(task, model_name, optional=False):
+    """
+    Registers a module's use of a shared model and returns a lazy handle to it.
+    Optional models return None unless LOAD_OPTIONAL_MODELS is enabled.
+    """
+    if optional and not LOAD_OPTIONAL_MODELS:
+        return None
+
+    with _lock:
+        _handles[(task, model_name)] += 1
+    return LazyModel(task, model_name)
+
+def _resolve(names):
+    """Maps model names (or "task:model" keys) to registered keys; None or "all" selects everything."""
+    registered = list(_handles)
+    if not names or "all" in names:
+        return registered
+
+    selected = []
+    for name in names:
+        for task, model_name in registered:
+            if name in (model_name, f"{task}:{model_name}") and (task, model_name) not in selected:
+                selected.append((task, model_name))
+    return selected
+
+def warmup(names=None):
+    """Preloads the selected registered models in a background thread and returns their keys."""
+    keys = [key for key in _resolve(names) if key not in _models]
+
+    def _preload():
+        for key in keys:
+            try:
+                get_model(*key)
+            except Exception as e:
+                print(f"Model warm-up failed for {key[1]}: {e}")
+
+    if keys:
+        threading.Thread(target=_preload, name="model-warmup", daemon=True).start()
+    return [f"{task}:{model_name}" for task, model_name in keys]
+
+def get_load_counts():
+    """Returns how many times each model has been loaded in this process."""
+    return {f"{task}:{model_name}": count for (task, model_name), count in _load_counts.items()}
+
+def get_registry_status():
+    """Returns load counts, handles per model and the loaded/loading/pending state of each model."""
+    def fmt(keys):
+        return [f"{task}:{model_name}" for task, model_name in keys]
+
+    with _lock:
+        return {
+            "load_counts": get_load_counts(),
+            "handles": {f"{task}:{model_name}": count for (task, model_name), count in _handles.items()},
+            "loaded": fmt(_models),
+            "loading": fmt(_loading),
+            "pending": fmt(key for key in _handles if key not in _models and key not in _loading),
+            "errors": {f"{task}:{model_name}": error for (task, model_name), error in _load_errors.items()},
+        }
@@ -0,0 +1,110 @@
+import os
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+import pytesseract
+from PIL import Image, ImageOps
+
+# Each tesseract call is its own subprocess, so threads are enough to run them in parallel;
+# the pool size caps concurrent tesseract processes for the whole worker
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(os.cpu_count() or 1)))
+# Longer side beyond which images are downscaled (~A4 at 300 DPI is 3508 px)
+OCR_MAX_SIDE = int(os.getenv("OCR_MAX_SIDE", "3600"))
+# Images taller than this are cut into horizontal strips OCR'd in parallel
+OCR_TILE_HEIGHT = int(os.getenv("OCR_TILE_HEIGHT", "1200"))
+# How far a strip boundary may move to land on a blank row instead of cutting through text
+OCR_TILE_SEARCH = int(os.getenv("OCR_TILE_SEARCH", "150"))
+# Page segmentation mode; 3 is tesseract's default fully automatic layout analysis
+OCR_PSM = os.getenv("OCR_PSM", "3")
+
+ocr_pool = ThreadPoolExecutor(max_workers=OCR_WORKERS, thread_name_prefix="ocr")
+
+@lru_cache(maxsize=None)
+def ocr_version():
+    """Identifies the tesseract build and settings that shape OCR output, for cache keys"""
+    try:
+        tesseract = pytesseract.get_tesseract_version()
+    except Exception:
+        tesseract = "unknown"
+    return f"tesseract-{tesseract}/psm{OCR_PSM}/side{OCR_MAX_SIDE}/strip{OCR_TILE_HEIGHT}-{OCR_TILE_SEARCH}/flat-otsu"
+
+def otsu_threshold(histogram):
+    """Threshold separating ink from paper, from a 256-bin grayscale histogram"""
+    total = sum(histogram)
+    weighted_total = sum(level * count for level, count in enumerate(histogram))
+    background = weighted_background = 0
+    best_level, best_variance = 127, 0.0
+    for level, count in enumerate(histogram):
+        background += count
+        if background == 0:
+            continue
+        foreground = total - background
+        if foreground == 0:
+            break
+        weighted_background += level * count
+        mean_background = weighted_background / background
+        mean_foreground = (weighted_total - weighted_background) / foreground
+        variance = background * foreground * (mean_background - mean_foreground) ** 2
+        if variance > best_variance:
+            best_level, best_variance = level, variance
+    return best_level
+
+def grayscale(image):
+    """8-bit grayscale, with transparent areas flattened onto white and 16/32-bit samples rescaled"""
+    if image.mode in ("I", "F") or image.mode.startswith("I;16"):
+        # A plain convert("L") clips anything above 255, which is nearly every 16-bit sample
+        if image.mode not in ("I", "F"):
+            image = image.convert("I")
+        low, high = image.getextrema()
+        scale = 255 / (high - low) if high > low else 1
+        offset = -low * scale
+        return image.point(lambda value: value * scale + offset).convert("L")
+    if image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info):
+        # Like pytesseract does: transparent pixels are usually meant as white paper, not black
+        image = Image.alpha_composite(Image.new("RGBA", image.size, "white"), image.convert("RGBA"))
+    return image.convert("L")
+
+def preprocess(image):
+    """Upright, downscaled if oversized, grayscale and binarized"""
+    if max(image.size) > OCR_MAX_SIDE:
+        # draft() lets JPEG decode straight to a reduced grayscale size; it must run before the first load
+        image.draft("L", (OCR_MAX_SIDE, OCR_MAX_SIDE))
+    image = grayscale(ImageOps.exif_transpose(image))
+    if max(image.size) > OCR_MAX_SIDE:
+        image.thumbnail((OCR_MAX_SIDE, OCR_MAX_SIDE), Image.LANCZOS)
+    image = ImageOps.autocontrast(image)
+    threshold = otsu_threshold(image.histogram())
+    return image.point([0] * (threshold + 1) + [255] * (255 - threshold))
+
+def strip_bounds(image):
+    """Row ranges for horizontal strips, with each cut moved to the blankest nearby row"""
+    width, height = image.size
+    if height <= OCR_TILE_HEIGHT:
+        return [(0, height)]
+    # Averaging every row down to one pixel gives a per-row ink profile in a single C call
+    row_means = list(image.resize((1, height), Image.BOX).getdata())
+    bounds = []
+    top = 0
+    while height - top > OCR_TILE_HEIGHT:
+        target = top + OCR_TILE_HEIGHT
+        window = range(max(top + 1, target - OCR_TILE_SEARCH), min(height, target + OCR_TILE_SEARCH))
+        cut = max(window, key=lambda row: (row_means[row], -abs(row - target)))
+        bounds.append((top, cut))
+        top = cut
+    bounds.append((top, height))
+    return bounds
+
+def _ocr_strip(image):
+    return pytesseract.image_to_string(image, config=f"--psm {OCR_PSM}")
+
+def ocr_image(image, executor=ocr_pool):
+    """
+    OCRs a PIL image: preprocesses it, cuts tall images into strips and runs the strips
+    on `executor`. Pass executor=None to run them one after another in this thread.
+    """
+    image = preprocess(image)
+    strips = [image.crop((0, top, image.width, bottom)) for top, bottom in strip_bounds(image)]
+    if executor is None or len(strips) == 1:
+        texts = [_ocr_strip(strip) for strip in strips]
+    else:
+        texts = list(executor.map(_ocr_strip, strips))
+    return "\n".join(text.strip() for text in texts if text.strip())
@@ -1,9 +1,202 @@
+import io
+import os
+import json
+import shutil
+import weakref
+import tempfile
+from collections import deque
+from contextlib import ExitStack
 import PyPDF2
+from PIL import Image
+from services.ocr import ocr_image, ocr_pool, ocr_version
+from services.extraction_cache import extraction_cache
+from services.worker_pools import get_process_pool
+from services.upload_limits import upload_budget, upload_size
 
-def extract_text_from_pdf(pdf_bytes):
-    """Extracts text from a PDF document."""
-    pdf_reader = PyPDF2.PdfReader(pdf_bytes)
-    text = ""
-    for page in pdf_reader.pages:
-        text += page.extract_text() + "\n"
-    return text.strip()
+# Pages are extracted in parallel across processes; PyPDF2 is pure Python and holds the GIL
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 1)))
+# Pages handed to a worker per task
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "4"))
+# Documents with at most this many (selected) pages are extracted in-process
+PDF_INLINE_MAX_PAGES = int(os.getenv("PDF_INLINE_MAX_PAGES", "4"))
+# OCR the embedded images of pages with no text layer (scanned documents)
+PDF_OCR_FALLBACK = os.getenv("PDF_OCR_FALLBACK", "1") == "1"
+
+def parse_page_range(spec, page_count):
+    """
+    Turns a 1-based range spec like "1-3,7,10-" into sorted 0-based page indices.
+    An empty spec selects every page.
+    """
+    if not spec or not spec.strip():
+        return list(range(page_count))
+    pages = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, dash, last = part.partition("-")
+        start = int(first) if first.strip() else 1
+        stop = (int(last) if last.strip() else page_count) if dash else start
+        if start < 1 or stop < start:
+            raise ValueError(f"invalid page range: {part!r}")
+        pages.update(range(start - 1, min(stop, page_count)))
+    if not pages:
+        raise ValueError(f"page range {spec!r} selects none of the {page_count} pages")
+    return sorted(pages)
+
+def spool_to_disk(fileobj):
+    """Copies an upload to a temporary file in chunks, so workers can open it by path"""
+    fileobj.seek(0)
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as target:
+        shutil.copyfileobj(fileobj, target, 1024 * 1024)
+        return target.name
+
+# Workers usually get several consecutive tasks for the same file; keep its reader around
+_reader_cache = {}
+
+def _open_reader(path):
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    if key not in _reader_cache:
+        for handle, _ in _reader_cache.values():
+            handle.close()
+        _reader_cache.clear()
+        # Given a path, PdfReader reads the whole file into memory; given a handle it seeks as needed
+        handle = open(path, "rb")
+        _reader_cache[key] = (handle, PyPDF2.PdfReader(handle))
+    return _reader_cache[key][1]
+
+def _ocr_page(page, executor):
+    """Text of a page with no text layer, from OCR of the images embedded in it"""
+    texts = []
+    try:
+        # PyPDF2 decodes every image on the page while building this list, so it can raise too
+        images = page.images
+        for embedded in images:
+            try:
+                texts.append(ocr_image(Image.open(io.BytesIO(embedded.data)), executor))
+            except Exception as e:
+                print(f"Error OCRing image {embedded.name} in PDF: {e}")
+    except Exception as e:
+        print(f"Error reading images of a PDF page: {e}")
+        return ""
+    return "\n".join(text for text in texts if text)
+
+def _read_pages(reader, page_numbers, executor):
+    results = []
+    for number in page_numbers:
+        page = reader.pages[number]
+        text = page.extract_text() or ""
+        if not text.strip() and PDF_OCR_FALLBACK:
+            text = _ocr_page(page, executor)
+        results.append((number, text))
+    return results
+
+def _extract_pages(path, page_numbers):
+    """Runs in a worker: returns (page_number, text) for each requested page"""
+    # Workers already run side by side, so scanned pages are OCR'd strip by strip within each one
+    return _read_pages(_open_reader(path), page_numbers, executor=None)
+
+def iter_pdf_pages(pdf, pages=None):
+    """
+    Returns an iterator of (page_number, text) in page order for a PDF given as a path or a
+    seekable binary file object (e.g. an UploadFile's spooled file, used in place).
+    `pages` is a 1-based range spec (see parse_page_range). The document and range are
+    validated before this returns, so a stream can still fail with a proper status code;
+    unreadable documents raise ValueError like bad ranges do. The file's size is held
+    against the upload memory budget until the iterator is exhausted or closed.
+    Documents seen before are answered from the extraction cache without being parsed.
+    """
+    cleanup = ExitStack()
+    try:
+        if isinstance(pdf, (str, os.PathLike)):
+            path = pdf
+            pdf = cleanup.enter_context(open(path, "rb"))
+        else:
+            path = None
+
+        cache_key = extraction_cache.make_key(pdf, pdf_extractor_version(), (pages or "").replace(" ", ""))
+        cached = extraction_cache.get(cache_key)
+        if cached is not None:
+            cleanup.close()
+            return (tuple(page) for page in json.loads(cached))
+
+        cleanup.enter_context(upload_budget.reserve(upload_size(pdf)))
+
+        reader = PyPDF2.PdfReader(pdf)
+        selected = parse_page_range(pages, len(reader.pages))
+        if len(selected) <= PDF_INLINE_MAX_PAGES:
+            with cleanup:
+                extracted = _read_pages(reader, selected, ocr_pool)
+            extraction_cache.put(cache_key, json.dumps(extracted))
+            return (page for page in extracted)
+
+        if path is None:
+            path = spool_to_disk(pdf)
+            cleanup.callback(os.unlink, path)
+    except PyPDF2.errors.PdfReadError as e:
+        cleanup.close()
+        raise ValueError(str(e)) from e
+    except BaseException:
+        cleanup.close()
+        raise
+    return PageStream(_caching(_iter_parallel(path, selected, cleanup), cache_key), cleanup)
+
+class PageStream:
+    """
+    Iterator over extracted pages that owns the upload's budget reservation and temp file.
+    They are released when the pages are exhausted or the stream is closed, including a
+    stream that was never started (closing an unstarted generator skips its finally),
+    and as a last resort when the stream is garbage collected.
+    """
+
+    def __init__(self, pages, cleanup):
+        self._pages = pages
+        self._release = weakref.finalize(self, cleanup.close)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._pages)
+
+    def close(self):
+        self._pages.close()
+        self._release()
+
+def pdf_extractor_version():
+    """Identifies the parser (and OCR fallback) producing page text, for cache keys"""
+    return f"pdf:PyPDF2-{PyPDF2.__version__}/ocr-{ocr_version() if PDF_OCR_FALLBACK else 'off'}"
+
+def _caching(page_texts, cache_key):
+    """Passes pages through and caches the document once every page has been extracted"""
+    extracted = []
+    try:
+        for page in page_texts:
+            extracted.append(page)
+            yield page
+    finally:
+        page_texts.close()
+    extraction_cache.put(cache_key, json.dumps(extracted))
+
+def _iter_parallel(path, selected, cleanup):
+    """At most two tasks per worker are in flight, so only a window of page text is held in memory"""
+    pool = get_process_pool("pdf-extraction", PDF_WORKERS)
+    tasks = (selected[i:i + PDF_PAGES_PER_TASK] for i in range(0, len(selected), PDF_PAGES_PER_TASK))
+    in_flight = deque()
+    try:
+        for task in tasks:
+            in_flight.append(pool.submit(_extract_pages, path, task))
+            if len(in_flight) >= PDF_WORKERS * 2:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+    finally:
+        # A client that stops reading a stream shouldn't leave pages queued
+        for future in in_flight:
+            future.cancel()
+        cleanup.close()
+
+def extract_text_from_pdf(pdf, pages=None):
+    """Extracts text from a PDF document (a path or a binary file object), optionally limited to a page range."""
+    return "\n".join(text for _, text in iter_pdf_pages(pdf, pages)).strip()
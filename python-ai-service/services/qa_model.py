@@ -1,6 +1,6 @@
-from transformers import pipeline
+from services.model_registry import acquire, LIGHT_EXTRACTIVE_QA
 
-qa_pipeline = pipeline("question-answering", model="distilbert-base-cased-distilled-squad")
+qa_pipeline = acquire(*LIGHT_EXTRACTIVE_QA)
 
 def answer_question(question, context):
     return qa_pipeline(question=question, context=context)["answer"]
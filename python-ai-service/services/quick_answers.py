@@ -1,74 +1,86 @@
 import os
+import re
+import hashlib
 import requests
-from pinecone import Pinecone, ServerlessSpec
 from dotenv import load_dotenv
-from transformers import pipeline
 from fastapi import FastAPI, HTTPException
-from huggingface_hub import InferenceClient
-from sentence_transformers import SentenceTransformer
+from huggingface_hub import AsyncInferenceClient
+from services.batching import get_batcher, as_list
+from services.embedding_service import get_text_embedding_async
+from services.model_registry import acquire, EXTRACTIVE_QA, GENERAL_QA
+from services.result_cache import ResultCache
+from services.semantic_cache import SemanticCache
+from services.vector_store import query_vectors
 
 load_dotenv() 
 
-# Load embedding model for vector search
-embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+# Cache of final answers, keyed on the question and the context it was answered from
+answer_cache = ResultCache(
+    "answers",
+    max_entries=int(os.getenv("ANSWER_CACHE_SIZE", "2000")),
+    ttl_seconds=float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600")),
+)
+
+# Near-duplicate question cache; rephrasings above the cosine threshold reuse the answer
+semantic_cache = SemanticCache(
+    capacity=int(os.getenv("SEMANTIC_CACHE_SIZE", "1000")),
+    threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92")),
+    ttl_seconds=float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600")),
+)
 
 # Initialize QA pipeline
-qa_pipeline = pipeline("question-answering", model="deepset/roberta-base-squad2")
+qa_pipeline = acquire(*EXTRACTIVE_QA)
 
-# Initialize general knowledge model
-general_qa_model = pipeline("text2text-generation", model="google/flan-t5-base")
+def _qa_batch(pairs):
+    """Runs extractive QA over a batch of (question, context) pairs."""
+    questions = [question for question, _ in pairs]
+    contexts = [context for _, context in pairs]
+    return as_list(qa_pipeline(question=questions, context=contexts, batch_size=len(pairs)))
 
-# --- Pinecone Setup ---
-def init_pinecone():
-    # Initialize Pinecone connection with new API
-    pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
-    
-    # Connect to index
-    index_name = os.getenv("PINECONE_INDEX")
-    
-    # Check if index exists, if not create it
-    if index_name not in pc.list_indexes().names():
-        pc.create_index(
-            name=index_name,
-            dimension=embedding_model.get_sentence_embedding_dimension(),
-            metric="cosine",
-            spec=ServerlessSpec(
-                cloud=os.getenv("PINECONE_CLOUD"),
-                region=os.getenv("PINECONE_REGION")
-            )
-        )
-    
-    # Return the index
-    return pc.Index(index_name)
+qa_batcher = get_batcher("extractive-qa", _qa_batch)
+
+# Local general knowledge model (unused; answers come from the HF Inference API)
+general_qa_model = acquire(*GENERAL_QA, optional=True)
 
-# Initialize Pinecone index
-pinecone_index = init_pinecone()
+# Async Hugging Face client, created on first use
+_hf_client = None
+
+def get_hf_client():
+    """Returns the shared async Hugging Face Inference client."""
+    global _hf_client
+    if _hf_client is None:
+        _hf_client = AsyncInferenceClient(
+            provider="hf-inference",
+            api_key=os.getenv("HUGGINGFACE_TOKEN")
+        )
+    return _hf_client
 
 # --- Helper Functions ---
 
-def get_embedding(text):
+async def get_embedding(text):
     """Generate embedding vector for text using the sentence transformer model"""
-    return embedding_model.encode(text).tolist()
+    return await get_text_embedding_async(text)
+
+async def extract_answer(question, context):
+    """Extracts the answer span for a question from a context passage"""
+    return (await qa_batcher.asubmit((question, context)))["answer"]
 
-def search_pinecone_for_context(question):
+async def search_pinecone_for_context(question, question_embedding=None):
     """
     Searches Pinecone vector database for context related to the question.
     Returns context string if found, None otherwise.
     """
     try:
-        # Convert question to vector embedding
-        question_embedding = get_embedding(question)
+        # Convert question to vector embedding (unless the caller already has it)
+        if question_embedding is None:
+            question_embedding = await get_embedding(question)
         
-        # Search Pinecone (updated for new API)
-        results = pinecone_index.query(
-            vector=question_embedding,
-            top_k=3,
-            include_metadata=True
-        )
+        # Search the configured vector store (Pinecone and/or the local index)
+        matches = await query_vectors(question_embedding, top_k=3)
         
-        # If results found, concatenate relevant contexts (updated for new API response format)
-        if results and results.matches:
-            contexts = [match.metadata['text'] for match in results.matches 
+        # If results found, concatenate relevant contexts
+        if matches:
+            contexts = [match.metadata['text'] for match in matches 
                         if match.score > 0.7]  # Only use high relevance matches
             if contexts:
                 return " ".join(contexts)
@@ -78,17 +90,12 @@ def search_pinecone_for_context(question):
         print(f"Pinecone search error: {e}")
         return None
 
-def general_knowledge_model(question):
+async def general_knowledge_model(question):
     """
     Uses a general knowledge model to answer questions without context.
     Returns answer string or None if confidence is low.
     """
     try:
-        client = InferenceClient(
-	    provider="hf-inference",
-	    api_key=os.getenv("HUGGINGFACE_TOKEN")
-        )
-
         messages = [
             {
                 "role": "user",
@@ -96,7 +103,7 @@ def general_knowledge_model(question):
             }
         ]
 
-        completion = client.chat.completions.create(
+        completion = await get_hf_client().chat.completions.create(
             model="google/gemma-2-2b-it", 
             messages=messages, 
             max_tokens=500,
@@ -107,20 +114,76 @@ def general_knowledge_model(question):
         print(f"General knowledge model error: {e}")
         return None
 
-def answer_question(question, context=None):
+def invalidate_answer_caches():
+    """Drops cached answers after the knowledge base changes"""
+    answer_cache.invalidate()
+    semantic_cache.invalidate()
+
+def normalize_question(question):
+    """Lowercases, collapses whitespace and drops trailing punctuation so trivial variants share a key"""
+    return re.sub(r"\s+", " ", question.lower()).strip().rstrip("?!. ")
+
+def make_answer_cache_key(question, pinecone_context, context):
+    """Cache key: normalized question plus a fingerprint of the context the answer is drawn from"""
+    if pinecone_context:
+        source, source_context = "kb", pinecone_context
+    elif context:
+        source, source_context = "user", context
+    else:
+        source, source_context = "general", ""
+    fingerprint = hashlib.sha256(source_context.encode("utf-8")).hexdigest()
+    return (normalize_question(question), source, fingerprint)
+
+async def answer_question(question, context=None):
     """
     Performs question answering by:
     1. First checking Pinecone for relevant information
     2. Using a model for general knowledge if no context found
     3. Requesting context from user only as a last resort
+    Answers are cached per question and context; cache hits report a "cache:" source.
+    Without user context, near-duplicate questions are answered from the semantic cache
+    and report a "semantic_cache:" source.
     """
+    try:
+        question_embedding = await get_embedding(question)
+    except Exception as e:
+        # Without an embedding there is no semantic cache or retrieval, but user context and
+        # the general model can still answer
+        print(f"Question embedding error: {e}")
+        question_embedding = None
+
+    # Rephrasings of a recently answered question skip retrieval and the models entirely.
+    # Answers drawn from user-provided context depend on that context, so they are not shared.
+    if not context and question_embedding is not None:
+        match = semantic_cache.lookup(question_embedding)
+        if match is not None:
+            cached, _ = match
+            return {**cached, "source": f"semantic_cache:{cached['source']}"}
+
     # Step 1: Check Pinecone vector database for relevant context
-    pinecone_context = search_pinecone_for_context(question)
-    
+    pinecone_context = None
+    if question_embedding is not None:
+        pinecone_context = await search_pinecone_for_context(question, question_embedding)
+
+    cache_key = make_answer_cache_key(question, pinecone_context, context)
+    cached = answer_cache.get(cache_key)
+    if cached is not None:
+        return {**cached, "source": f"cache:{cached['source']}"}
+
+    result = await _answer_from_sources(question, context, pinecone_context)
+    # Don't pin a "no information" reply; the knowledge base or remote model may succeed later
+    if result["source"] != "no_information_found":
+        answer_cache.put(cache_key, result)
+        if not context and question_embedding is not None:
+            semantic_cache.add(question_embedding, result)
+    return result
+
+async def _answer_from_sources(question, context, pinecone_context):
+    """Answers from the retrieved context, the user's context or the general knowledge model, in that order"""
     if pinecone_context:
         # Found relevant information in Pinecone
         return {
-            "answer": qa_pipeline(question=question, context=pinecone_context)["answer"],
+            "answer": await extract_answer(question, pinecone_context),
             "source": "pinecone_database",
             "context_used": pinecone_context[:200] + "..." if len(pinecone_context) > 200 else pinecone_context
         }
@@ -128,14 +191,14 @@ def answer_question(question, context=None):
     # Step 2: If user provided context, use it
     if context:
         return {
-            "answer": qa_pipeline(question=question, context=context)["answer"],
+            "answer": await extract_answer(question, context),
             "source": "user_provided_context",
             "context_used": context[:200] + "..." if len(context) > 200 else context
         }
     
     # Step 3: Try to answer with general knowledge model
     try:
-        general_answer = general_knowledge_model(question)
+        general_answer = await general_knowledge_model(question)
         if general_answer and len(general_answer) > 5:
             return {
                 "answer": general_answer,
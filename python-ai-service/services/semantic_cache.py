@@ -0,0 +1,77 @@
+import time
+import threading
+import numpy as np
+
+class SemanticCache:
+    """
+    Cache of recently answered questions matched by embedding similarity,
+    so rephrasings of a question reuse its answer. Question embeddings are
+    kept L2-normalized in a fixed-size ring buffer and searched with one
+    matrix-vector product; the oldest entry is overwritten when full.
+    """
+
+    def __init__(self, capacity=1000, threshold=0.92, ttl_seconds=3600):
+        self.capacity = capacity
+        self.threshold = threshold
+        self.ttl = ttl_seconds
+        self._vectors = None
+        self._values = [None] * capacity
+        self._expires = np.zeros(capacity)
+        self._next = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _normalize(self, vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+    def lookup(self, vector):
+        """Returns (value, similarity) for the closest live entry above the threshold, or None."""
+        with self._lock:
+            if self._size:
+                scores = self._vectors[:self._size] @ self._normalize(vector)
+                # Expired entries never match
+                scores[self._expires[:self._size] <= time.monotonic()] = -1.0
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    self.hits += 1
+                    return self._values[best], float(scores[best])
+            self.misses += 1
+            return None
+
+    def add(self, vector, value):
+        with self._lock:
+            vector = self._normalize(vector)
+            if self._vectors is None:
+                self._vectors = np.zeros((self.capacity, vector.shape[0]), dtype=np.float32)
+            slot = self._next
+            self._vectors[slot] = vector
+            self._values[slot] = value
+            self._expires[slot] = time.monotonic() + self.ttl
+            self._next = (slot + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+
+    def invalidate(self):
+        with self._lock:
+            self._values = [None] * self.capacity
+            self._next = 0
+            self._size = 0
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": self._size,
+                "capacity": self.capacity,
+                "threshold": self.threshold,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_ratio": self.hits / lookups if lookups else 0,
+            }
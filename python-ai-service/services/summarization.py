@@ -1,6 +1,6 @@
-from transformers import pipeline
+from services.model_registry import acquire, SUMMARIZER
 
-summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
+summarizer = acquire(*SUMMARIZER)
 
 def summarize_text(text):
     return summarizer(text, max_length=130, min_length=30, do_sample=False)[0]["summary_text"]
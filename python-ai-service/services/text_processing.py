@@ -1,46 +1,340 @@
+import os
 import re
-from transformers import pipeline
+import threading
+from collections import Counter
+from concurrent.futures import as_completed
+from services.batching import get_batcher, as_list
+from services.cascade_classifier import cascade_classify
+from services.result_cache import ResultCache
+from services.model_registry import acquire, SUMMARIZER, ZERO_SHOT_CLASSIFIER
+from services.zero_shot import ZeroShotEngine
 
 # Initialize AI Models
-summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
-classifier = pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
-qa_pipeline = pipeline("question-answering", model="distilbert-base-cased-distilled-squad")
+summarizer = acquire(*SUMMARIZER)
+classifier = acquire(*ZERO_SHOT_CLASSIFIER)
 
-def summarize_text(text):
-    MAX_INPUT_LENGTH = 1024  # BART max tokens
-    SAFE_CHUNK_SIZE = 900  # To prevent exceeding model limits
+TASK_LABELS = [
+    "research_analysis",
+    "message_processing",
+    "upload_file",
+    "file_retrieval",
+    "organize_files",
+    "finance_analysis",
+    "send_email",
+    "fetch_unread_emails",
+    "summarize_emails",
+    "search_emails",
+    "meeting_scheduling",
+    "fetch_upcoming_events",
+    "market_research",
+    "quick_answers",
+    "report_generation",
+    "progress_tracking",
+    "health_reminders",
+]
 
-    words = text.split()
-    
-    # If input is too large, split it into smaller chunks
-    if len(words) > SAFE_CHUNK_SIZE:
-        print("⚠️ Input too long! Splitting into chunks...")
+def _summarize_batch(texts):
+    """Runs one batched forward pass of the summarizer."""
+    results = summarizer(texts, batch_size=len(texts), truncation=True,
+                         max_length=150, min_length=50, do_sample=False)
+    return [result["summary_text"] for result in as_list(results)]
+
+# Zero-shot over the fixed task labels, with the label hypotheses tokenized once
+task_zero_shot = ZeroShotEngine(classifier, TASK_LABELS)
+
+def _classify_batch(texts):
+    """Runs zero-shot classification over the task labels for a batch of texts in one forward pass."""
+    return task_zero_shot.classify_batch(texts)
+
+summarize_batcher = get_batcher("summarizer", _summarize_batch)
+classify_batcher = get_batcher("zero-shot-classifier", _classify_batch)
+
+MAX_INPUT_TOKENS = 1024  # BART max tokens
+CHUNK_TOKENS = 1000  # Leaves room for the special tokens the tokenizer adds
+WORD_BOUNDARY_LOOKBACK = 64  # How far back a chunk end may move to avoid splitting a word
+
+def split_into_token_chunks(text, max_tokens=CHUNK_TOKENS):
+    """
+    Splits text on tokenizer boundaries into pieces that each fit the summarizer,
+    preferring to cut where a new word starts so no word is split across chunks.
+    """
+    tokenizer = summarizer.tokenizer
+    if not tokenizer.is_fast:
+        # Slow tokenizers have no offsets; decode fixed token windows instead
+        ids = tokenizer(text, add_special_tokens=False)["input_ids"]
+        return [tokenizer.decode(ids[i:i + max_tokens]).strip() for i in range(0, len(ids), max_tokens)] or [text]
+
+    offsets = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)["offset_mapping"]
+    if len(offsets) <= max_tokens:
+        return [text]
 
-        chunks = []
-        for i in range(0, len(words), SAFE_CHUNK_SIZE):
-            chunk = " ".join(words[i:i + SAFE_CHUNK_SIZE])
+    chunks = []
+    start = 0
+    while start < len(offsets):
+        end = min(start + max_tokens, len(offsets))
+        if end < len(offsets):
+            # Step back to a token that begins a new word
+            for candidate in range(end, max(start, end - WORD_BOUNDARY_LOOKBACK), -1):
+                char = offsets[candidate][0]
+                if char > 0 and text[char - 1].isspace():
+                    end = candidate
+                    break
+        chunk = text[offsets[start][0]:offsets[end - 1][1]].strip()
+        if chunk:
             chunks.append(chunk)
+        start = end
+    return chunks
+
+def iter_summarize_text(text):
+    """
+    Summarizes text incrementally, yielding events as they become ready:
+    {"type": "chunk", ...} for each chunk summary (level > 0 for hierarchical reduce passes),
+    {"type": "error", ...} for a chunk that failed, and finally {"type": "final", "summary": ...}.
+    """
+    chunks = split_into_token_chunks(text)
+
+    # If input is within limits, summarize directly
+    if len(chunks) == 1:
+        yield {"type": "final", "summary": summarize_batcher.submit(chunks[0])}
+        return
+
+    print("⚠️ Input too long! Splitting into chunks...")
 
-        # Summarize each chunk separately
-        summarized_chunks = []
-        for chunk in chunks:
+    # Map: summarize every chunk; reduce hierarchically while the joined summaries
+    # still exceed the model input, so nothing is silently truncated
+    level = 0
+    while len(chunks) > 1:
+        # Queued together so the chunks share batched forward passes
+        pending = {summarize_batcher.submit_async(chunk): index for index, chunk in enumerate(chunks)}
+        summaries = [None] * len(chunks)
+        for future in as_completed(pending):
+            index = pending[future]
             try:
-                summary = summarizer(chunk, max_length=150, min_length=50, do_sample=False)[0]["summary_text"]
-                summarized_chunks.append(summary)
+                summaries[index] = future.result()
             except Exception as e:
                 print(f"❌ Error summarizing chunk: {e}")
+                yield {"type": "error", "level": level, "index": index, "detail": str(e)}
+                continue
+            yield {"type": "chunk", "level": level, "index": index, "total": len(chunks), "summary": summaries[index]}
 
-        # Summarize the combined summary
-        final_summary_input = " ".join(summarized_chunks)
-        return summarizer(final_summary_input, max_length=150, min_length=50, do_sample=False)[0]["summary_text"]
+        summaries = [summary for summary in summaries if summary is not None]
+        if not summaries:
+            raise RuntimeError("Failed to summarize any chunk of the input")
+        chunks = split_into_token_chunks(" ".join(summaries))
+        level += 1
 
-    # If input is within limits, summarize directly
-    return summarizer(text, max_length=150, min_length=50, do_sample=False)[0]["summary_text"]
+    # Summarize the combined summary
+    yield {"type": "final", "summary": summarize_batcher.submit(chunks[0])}
+
+def summarize_text(text):
+    for event in iter_summarize_text(text):
+        if event["type"] == "final":
+            return event["summary"]
+
+# ===== CLASSIFICATION RULES =====
+# Rules are compiled once at import; classify_text only runs them.
+
+# Pattern-based classification rules (apply first for high-precision cases)
+TASK_PATTERNS = {
+    # Email operations with contextual patterns
+    "send_email": [
+        r"(send|write|compose|draft|create|prepare) (an |a |)(email|message|note) (to|for) \w+",
+        r"email (to|for) \w+ (about|regarding|concerning)",
+        r"(send|shoot|fire off) (a |an |)email (to|for)",
+    ],
+    "fetch_unread_emails": [
+        r"(get|check|retrieve|show|fetch|read|display) (my |the |)(unread|new|latest|recent) (emails|messages|inbox)",
+        r"(any|what|are there) (new|unread|recent) (emails|messages)",
+        r"(what'?s|what is) (in|new in) my inbox",
+        r"check (my |the |)inbox"
+    ],
+    "summarize_emails": [
+        r"(summarize|condense|digest|give me a summary of) (my |the |)(emails|messages|inbox)",
+        r"(make|create|generate) (a |an |)(summary|overview|digest) of (my |the |)(emails|messages)",
+        r"(what's|what is) important in my (emails|inbox|messages)"
+    ],
+    "search_emails": [
+        r"(find|search|locate|look for) (emails|messages|mail) (from|about|containing|related to|with|that mention)",
+        r"(find|search for) \w+'s email",
+        r"(where is|can you locate) (the |that |)(email|message) (about|from|regarding)"
+    ],
+
+    # Calendar and meeting operations
+    "meeting_scheduling": [
+        r"(schedule|set up|arrange|book|plan|organize) (a |an |)(meeting|call|appointment|session)",
+        r"(add|put|create) (a |an |)(event|meeting|appointment) (on|in|to) (my |the |)calendar",
+        r"(book|schedule|reserve) (a |an |)(time|slot|session) (with|for)"
+    ],
+    "fetch_upcoming_events": [
+        r"(what|which|any|are there) (meetings|events|appointments|calls) (scheduled|coming up|planned)",
+        r"(show|check|list|display|get) (my |the |)(upcoming|scheduled|planned|future) (meetings|events|appointments)",
+        r"(what's|what is) (on|in) (my |the |)calendar",
+        r"(what|anything) (do I have|planned) (today|tomorrow|this week)"
+    ],
+
+    # File operations
+    "upload_file": [
+        r"(save|store|upload|backup|put) (this |the |a |an |)(file|document|spreadsheet|presentation)",
+        r"(create|make|start) (a |an |)(new |blank |)(file|document|folder|directory)"
+    ],
+    "organize_files": [
+        r"(arrange|organize|sort|tidy up|rearrange|clean up) (my |this |the |all |these |a |an )?(files?|documents?|folders?|spreadsheets?|presentations?|images?|videos?)"
+    ],
+
+    "file_retrieval": [
+        r"(find|get|retrieve|locate|fetch|download|open) (my |the |a |an |)(file|document|spreadsheet|presentation|pdf)",
+        r"(where is|can you locate) (my |the |)(file|document) (about|named|called|titled)"
+    ],
+
+    # Analysis tasks
+    "research_analysis": [
+        r"(research|analyze|investigate|look into|explore) (the |)(topic|subject|issue|matter|question) of",
+        r"(find|gather|collect) (information|data|details|facts) (about|on|regarding)",
+        r"(what|tell me) (is|about|do you know) (the |)(history|background|context) of"
+    ],
+    "finance_analysis": [
+        r"(analyze|review|check|examine) (my |the |)(finances|budget|expenses|spending|financial|accounts)",
+        r"(calculate|compute|figure out) (my |the |)(roi|return|profit|loss|margins|taxes)",
+        r"(track|monitor|follow) (my |the |)(spending|expenses|budget|investments)"
+    ],
+    "market_research": [
+        r"(research|analyze|investigate) (the |)(market|industry|sector|competition)",
+        r"(what's|what is) (trending|popular|hot) (in|on) (the |)(market|industry)",
+        r"(gather|collect|find) (information|data|intel) (on|about) (the |)(market|competitors|industry)"
+    ],
+
+    # Reporting and tracking
+    "report_generation": [
+        r"(generate|create|make|prepare|produce) (a |an |)(report|summary|overview|analysis)",
+        r"(compile|put together) (the |a |an |)(data|information|numbers|metrics) (into|for) (a |an |)(report|summary)",
+        r"(need|want) (a |an |)(report|summary|analysis) (on|of|about)"
+    ],
+    "progress_tracking": [
+        r"(track|monitor|follow|check) (my |the |our |)(progress|status|advancement|development)",
+        r"(how|what) (am I|are we) (doing|progressing) (on|with)",
+        r"(update|status) (on|of|for|about) (the |my |our |)(project|task|work|assignment)"
+    ],
+
+    # Health and wellbeing
+    "health_reminders": [
+        r"(remind|alert|notify) me (to|about) (take|drink|exercise|meditate|stretch)",
+        r"(set|create) (a |an |)(health|medication|hydration|exercise) reminder",
+        r"(track|monitor|log) (my |)(health|fitness|weight|calories|steps|sleep)"
+    ],
+
+    # Quick answers
+    "quick_answers": [
+        r"(what|who|when|where|why|how) (is|are|was|were|do|does|did|can|could|should)",
+        r"(tell|explain|define) (me |us |)(what|who|when|where|why|how)",
+        r"(quick|short|brief) (question|query): "
+    ]
+}
+
+# Define contextual keyword sets with weights
+TASK_KEYWORDS = {
+    "send_email": {
+        "primary": ["send", "compose", "draft", "write", "email to", "message to"],
+        "context": ["attach", "recipient", "subject line", "signature", "reply", "forward"],
+        "negative": ["find", "search", "unread", "inbox", "check"]
+    },
+    "fetch_unread_emails": {
+        "primary": ["check inbox", "check emails", "read latest", "unread emails", "get emails"],
+        "context": ["inbox", "unopened", "recent", "new messages", "notifications"],
+        "negative": ["send", "compose", "summary", "search for"]
+    },
+    "summarize_emails": {
+        "primary": ["summarize", "summary of", "brief of", "condense", "digest"],
+        "context": ["insights", "key points", "important messages", "highlight", "takeaway"],
+        "negative": ["find specific", "search for", "reply", "send"]
+    },
+    "search_emails": {
+        "primary": ["find email", "search email", "look up email", "locate message"],
+        "context": ["from person", "about topic", "containing attachment", "dated", "with keyword"],
+        "negative": ["send new", "compose", "draft", "unread"]
+    },
+    "meeting_scheduling": {
+        "primary": ["schedule", "book", "set up meeting", "create appointment", "calendar"],
+        "context": ["time slot", "availability", "duration", "participants", "zoom", "teams"],
+        "negative": ["summary", "check", "find", "search for"]
+    },
+    "file_retrieval": {
+        "primary": ["find file", "get document", "retrieve", "download", "access"],
+        "context": ["document", "spreadsheet", "presentation", "folder", "storage"],
+        "negative": ["create new", "write", "compose", "send"]
+    }
+}
+
+EMAIL_INDICATORS = ("email", "message", "inbox", "unread", "mailbox", "sender", "recipient")
+CALENDAR_INDICATORS = ("calendar", "schedule", "meeting", "appointment", "event", "reminder")
+FILE_INDICATORS = ("file", "document", "folder", "pdf", "spreadsheet", "presentation")
+
+# Rules compiled once, flattened to (task, regex) in priority order. An ordered scan of
+# precompiled regexes beats one combined alternation here: CPython's backtracking engine
+# retries every alternative at every position, which made the combined regex several
+# times slower, especially for prompts that match no rule.
+_RULES = [(task, re.compile(pattern)) for task, patterns in TASK_PATTERNS.items() for pattern in patterns]
+
+def match_task_rules(text_clean):
+    """Returns the task of the highest-priority rule that matches the text, or None."""
+    for task, regex in _RULES:
+        if regex.search(text_clean):
+            return task
+    return None
+
+# Keyword weights flattened to (task, keyword, weight) tuples
+_KEYWORD_WEIGHTS = {"primary": 3, "context": 1, "negative": -2}
+_KEYWORD_RULES = [
+    (task, word, _KEYWORD_WEIGHTS[kind])
+    for task, keywords in TASK_KEYWORDS.items()
+    for kind, words in keywords.items()
+    for word in words
+]
+
+def match_task_keywords(text_clean):
+    """Returns the task with the highest weighted keyword score if it clears the threshold, else None."""
+    task_scores = dict.fromkeys(TASK_KEYWORDS, 0)
+    for task, word, weight in _KEYWORD_RULES:
+        if word in text_clean:
+            task_scores[task] += weight
+
+    # Find highest keyword score
+    max_score_task = max(task_scores.items(), key=lambda x: x[1])
+    if max_score_task[1] > 3:  # Threshold for keyword-based classification
+        return max_score_task[0]
+    return None
+
+# ===== CLASSIFICATION CACHE =====
+# Results keyed on the normalized prompt, remembering which path produced the label
+classification_cache = ResultCache(
+    "classification",
+    max_entries=int(os.getenv("CLASSIFICATION_CACHE_SIZE", "5000")),
+    ttl_seconds=float(os.getenv("CLASSIFICATION_CACHE_TTL_SECONDS", "3600")),
+)
+_path_counts = Counter()
+_cached_path_counts = Counter()
+_path_counts_lock = threading.Lock()
+
+def normalize_prompt(text):
+    """
+    The cleaned prompt the rule passes match against, also used as the classification
+    cache key; prompts sharing a key must get the same rule results.
+    """
+    return text.lower().strip()
+
+def classification_stats():
+    """Cache stats plus how often each path (regex, keywords, model, domain_fallback) produced the label"""
+    with _path_counts_lock:
+        return {
+            **classification_cache.stats(),
+            "computed_by_path": dict(_path_counts),
+            "cache_hits_by_path": dict(_cached_path_counts),
+        }
 
 def classify_text(text):
     """
     Classifies user input into specific task categories with enhanced accuracy through
     a combination of NLP classification and rule-based pattern matching.
+    Results are cached on the normalized prompt, so repeated prompts skip inference.
     
     Args:
         text (str): User's natural language prompt
@@ -48,136 +342,35 @@ def classify_text(text):
     Returns:
         str: The classified task type label
     """
-    labels = [
-        "research_analysis",
-        "message_processing",
-        "upload_file",
-        "file_retrieval",
-        "organize_files",
-        "finance_analysis",
-        "send_email",
-        "fetch_unread_emails",
-        "summarize_emails",
-        "search_emails",
-        "meeting_scheduling",
-        "fetch_upcoming_events",
-        "market_research",
-        "quick_answers",
-        "report_generation",
-        "progress_tracking",
-        "health_reminders",
-    ]
-    
-    # Load classifier (assuming this is defined elsewhere)
-    classifier = pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
-    
+    key = normalize_prompt(text)
+    cached = classification_cache.get(key)
+    if cached is not None:
+        label, path = cached
+        with _path_counts_lock:
+            _cached_path_counts[path] += 1
+        return label
+
+    label, path = classify_text_with_path(text)
+    classification_cache.put(key, (label, path))
+    with _path_counts_lock:
+        _path_counts[path] += 1
+    return label
+
+def classify_text_with_path(text):
+    """
+    Uncached classification. Returns (label, path) where path is the stage that
+    decided: "regex", "keywords", "domain_fallback" or "model".
+    """
     # Clean and normalize input text
-    text_clean = text.lower().strip()
-    
-    # Pattern-based classification rules (apply first for high-precision cases)
-    task_patterns = {
-        # Email operations with contextual patterns
-        "send_email": [
-            r"(send|write|compose|draft|create|prepare) (an |a |)(email|message|note) (to|for) \w+",
-            r"email (to|for) \w+ (about|regarding|concerning)",
-            r"(send|shoot|fire off) (a |an |)email (to|for)",
-        ],
-        "fetch_unread_emails": [
-            r"(get|check|retrieve|show|fetch|read|display) (my |the |)(unread|new|latest|recent) (emails|messages|inbox)",
-            r"(any|what|are there) (new|unread|recent) (emails|messages)",
-            r"(what'?s|what is) (in|new in) my inbox",
-            r"check (my |the |)inbox"
-        ],
-        "summarize_emails": [
-            r"(summarize|condense|digest|give me a summary of) (my |the |)(emails|messages|inbox)",
-            r"(make|create|generate) (a |an |)(summary|overview|digest) of (my |the |)(emails|messages)",
-            r"(what's|what is) important in my (emails|inbox|messages)"
-        ],
-        "search_emails": [
-            r"(find|search|locate|look for) (emails|messages|mail) (from|about|containing|related to|with|that mention)",
-            r"(find|search for) \w+'s email",
-            r"(where is|can you locate) (the |that |)(email|message) (about|from|regarding)"
-        ],
-        
-        # Calendar and meeting operations
-        "meeting_scheduling": [
-            r"(schedule|set up|arrange|book|plan|organize) (a |an |)(meeting|call|appointment|session)",
-            r"(add|put|create) (a |an |)(event|meeting|appointment) (on|in|to) (my |the |)calendar",
-            r"(book|schedule|reserve) (a |an |)(time|slot|session) (with|for)"
-        ],
-        "fetch_upcoming_events": [
-            r"(what|which|any|are there) (meetings|events|appointments|calls) (scheduled|coming up|planned)",
-            r"(show|check|list|display|get) (my |the |)(upcoming|scheduled|planned|future) (meetings|events|appointments)",
-            r"(what's|what is) (on|in) (my |the |)calendar",
-            r"(what|anything) (do I have|planned) (today|tomorrow|this week)"
-        ],
-        
-        # File operations
-        "upload_file": [
-            r"(save|store|upload|backup|put) (this |the |a |an |)(file|document|spreadsheet|presentation)",
-            r"(create|make|start) (a |an |)(new |blank |)(file|document|folder|directory)"
-        ],
-        "organize_files": [
-            r"(arrange|organize|sort|tidy up|rearrange|clean up) (my |this |the |all |these |a |an )?(files?|documents?|folders?|spreadsheets?|presentations?|images?|videos?)"
-        ],
-
-        "file_retrieval": [
-            r"(find|get|retrieve|locate|fetch|download|open) (my |the |a |an |)(file|document|spreadsheet|presentation|pdf)",
-            r"(where is|can you locate) (my |the |)(file|document) (about|named|called|titled)"
-        ],
-        
-        # Analysis tasks
-        "research_analysis": [
-            r"(research|analyze|investigate|look into|explore) (the |)(topic|subject|issue|matter|question) of",
-            r"(find|gather|collect) (information|data|details|facts) (about|on|regarding)",
-            r"(what|tell me) (is|about|do you know) (the |)(history|background|context) of"
-        ],
-        "finance_analysis": [
-            r"(analyze|review|check|examine) (my |the |)(finances|budget|expenses|spending|financial|accounts)",
-            r"(calculate|compute|figure out) (my |the |)(roi|return|profit|loss|margins|taxes)",
-            r"(track|monitor|follow) (my |the |)(spending|expenses|budget|investments)"
-        ],
-        "market_research": [
-            r"(research|analyze|investigate) (the |)(market|industry|sector|competition)",
-            r"(what's|what is) (trending|popular|hot) (in|on) (the |)(market|industry)",
-            r"(gather|collect|find) (information|data|intel) (on|about) (the |)(market|competitors|industry)"
-        ],
-        
-        # Reporting and tracking
-        "report_generation": [
-            r"(generate|create|make|prepare|produce) (a |an |)(report|summary|overview|analysis)",
-            r"(compile|put together) (the |a |an |)(data|information|numbers|metrics) (into|for) (a |an |)(report|summary)",
-            r"(need|want) (a |an |)(report|summary|analysis) (on|of|about)"
-        ],
-        "progress_tracking": [
-            r"(track|monitor|follow|check) (my |the |our |)(progress|status|advancement|development)",
-            r"(how|what) (am I|are we) (doing|progressing) (on|with)",
-            r"(update|status) (on|of|for|about) (the |my |our |)(project|task|work|assignment)"
-        ],
-        
-        # Health and wellbeing
-        "health_reminders": [
-            r"(remind|alert|notify) me (to|about) (take|drink|exercise|meditate|stretch)",
-            r"(set|create) (a |an |)(health|medication|hydration|exercise) reminder",
-            r"(track|monitor|log) (my |)(health|fitness|weight|calories|steps|sleep)"
-        ],
-        
-        # Quick answers
-        "quick_answers": [
-            r"(what|who|when|where|why|how) (is|are|was|were|do|does|did|can|could|should)",
-            r"(tell|explain|define) (me |us |)(what|who|when|where|why|how)",
-            r"(quick|short|brief) (question|query): "
-        ]
-    }
+    text_clean = normalize_prompt(text)
     
     # First pass: High-precision pattern matching
-    for task, patterns in task_patterns.items():
-        for pattern in patterns:
-            if re.search(pattern, text_clean):
-                return task
+    task = match_task_rules(text_clean)
+    if task:
+        return task, "regex"
     
-    # Second pass: NLP model classification
-    result = classifier(text, labels)
+    # Second pass: NLP model classification (embedding prototypes first, BART-MNLI when unsure)
+    result = cascade_classify(text, classify_batcher.submit)
     best_label = result["labels"][0]
     confidence_score = result["scores"][0]
     second_best_label = result["labels"][1]
@@ -185,83 +378,26 @@ def classify_text(text):
     
     # Keyword frequency and contextual analysis for ambiguous cases
     if confidence_score < 0.65 or (confidence_score - second_best_score < 0.2):
-        # Define contextual keyword sets with weights
-        task_keywords = {
-            "send_email": {
-                "primary": ["send", "compose", "draft", "write", "email to", "message to"],
-                "context": ["attach", "recipient", "subject line", "signature", "reply", "forward"],
-                "negative": ["find", "search", "unread", "inbox", "check"]
-            },
-            "fetch_unread_emails": {
-                "primary": ["check inbox", "check emails", "read latest", "unread emails", "get emails"],
-                "context": ["inbox", "unopened", "recent", "new messages", "notifications"],
-                "negative": ["send", "compose", "summary", "search for"]
-            },
-            "summarize_emails": {
-                "primary": ["summarize", "summary of", "brief of", "condense", "digest"],
-                "context": ["insights", "key points", "important messages", "highlight", "takeaway"],
-                "negative": ["find specific", "search for", "reply", "send"]
-            },
-            "search_emails": {
-                "primary": ["find email", "search email", "look up email", "locate message"],
-                "context": ["from person", "about topic", "containing attachment", "dated", "with keyword"],
-                "negative": ["send new", "compose", "draft", "unread"]
-            },
-            "meeting_scheduling": {
-                "primary": ["schedule", "book", "set up meeting", "create appointment", "calendar"],
-                "context": ["time slot", "availability", "duration", "participants", "zoom", "teams"],
-                "negative": ["summary", "check", "find", "search for"]
-            },
-            "file_retrieval": {
-                "primary": ["find file", "get document", "retrieve", "download", "access"],
-                "context": ["document", "spreadsheet", "presentation", "folder", "storage"],
-                "negative": ["create new", "write", "compose", "send"]
-            }
-        }
-        
         # Calculate weighted keyword scores
-        task_scores = {}
-        for task, keywords in task_keywords.items():
-            score = 0
-            # Check primary keywords (high weight)
-            for word in keywords["primary"]:
-                if word in text_clean:
-                    score += 3
-            # Check contextual keywords (medium weight)
-            for word in keywords["context"]:
-                if word in text_clean:
-                    score += 1
-            # Check negative keywords (negative weight)
-            for word in keywords["negative"]:
-                if word in text_clean:
-                    score -= 2
-            
-            task_scores[task] = score
-        
-        # Find highest keyword score
-        max_score_task = max(task_scores.items(), key=lambda x: x[1])
-        if max_score_task[1] > 3:  # Threshold for keyword-based classification
-            return max_score_task[0]
+        task = match_task_keywords(text_clean)
+        if task:
+            return task, "keywords"
     
     # Third pass: Domain-specific context detection
-    email_indicators = ["email", "message", "inbox", "unread", "mailbox", "sender", "recipient"]
-    calendar_indicators = ["calendar", "schedule", "meeting", "appointment", "event", "reminder"]
-    file_indicators = ["file", "document", "folder", "pdf", "spreadsheet", "presentation"]
-    
     # Check domain context to improve classification for ambiguous cases
-    email_context = sum(1 for word in email_indicators if word in text_clean)
-    calendar_context = sum(1 for word in calendar_indicators if word in text_clean)
-    file_context = sum(1 for word in file_indicators if word in text_clean)
+    email_context = sum(1 for word in EMAIL_INDICATORS if word in text_clean)
+    calendar_context = sum(1 for word in CALENDAR_INDICATORS if word in text_clean)
+    file_context = sum(1 for word in FILE_INDICATORS if word in text_clean)
     
     # If strong domain signal exists and model confidence is low
     if confidence_score < 0.55:
         if email_context > calendar_context and email_context > file_context:
             # Default to fetch_unread_emails as safest email operation if ambiguous
-            return "fetch_unread_emails"
+            return "fetch_unread_emails", "domain_fallback"
         elif calendar_context > email_context and calendar_context > file_context:
-            return "fetch_upcoming_events"
+            return "fetch_upcoming_events", "domain_fallback"
         elif file_context > email_context and file_context > calendar_context:
-            return "file_retrieval"
+            return "file_retrieval", "domain_fallback"
     
     # Final fallback: Use model prediction
-    return best_label
+    return best_label, "model"
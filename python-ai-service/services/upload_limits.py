@@ -0,0 +1,81 @@
+import os
+import threading
+from contextlib import contextmanager
+
+# Largest upload accepted by the file endpoints; checked against Content-Length before the body is read
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(50 * 1024 * 1024)))
+# Memory all in-flight uploads in this worker may claim at once (file bytes plus decoded images)
+UPLOAD_MEMORY_BUDGET_BYTES = int(os.getenv("UPLOAD_MEMORY_BUDGET_BYTES", str(512 * 1024 * 1024)))
+# How long a request waits for budget before giving up
+UPLOAD_BUDGET_TIMEOUT_SECONDS = float(os.getenv("UPLOAD_BUDGET_TIMEOUT_SECONDS", "30"))
+
+class UploadTooLarge(ValueError):
+    """The upload is over MAX_UPLOAD_BYTES, or needs more memory than the whole budget"""
+
+class BudgetExhausted(RuntimeError):
+    """Other requests held the memory budget for longer than the timeout"""
+
+def upload_size(fileobj):
+    """Size of a spooled upload, found by seeking rather than reading it"""
+    position = fileobj.tell()
+    fileobj.seek(0, os.SEEK_END)
+    size = fileobj.tell()
+    fileobj.seek(position)
+    return size
+
+def check_upload_size(size):
+    if size > MAX_UPLOAD_BYTES:
+        raise UploadTooLarge(f"upload is {size} bytes; the limit is {MAX_UPLOAD_BYTES}")
+
+class MemoryBudget:
+    """
+    Byte budget shared by concurrent upload handlers. Each request reserves its estimated
+    peak before doing the memory-heavy part and waits while the budget is spent.
+    """
+
+    def __init__(self, capacity, timeout):
+        self.capacity = capacity
+        self.timeout = timeout
+        self._in_use = 0
+        self._cond = threading.Condition()
+        self._peak = 0
+        self._largest_request = 0
+        self._requests = 0
+        self._waits = 0
+        self._timeouts = 0
+
+    @contextmanager
+    def reserve(self, nbytes):
+        if nbytes > self.capacity:
+            raise UploadTooLarge(f"request needs ~{nbytes} bytes; the worker budget is {self.capacity}")
+        with self._cond:
+            if self._in_use + nbytes > self.capacity:
+                self._waits += 1
+                if not self._cond.wait_for(lambda: self._in_use + nbytes <= self.capacity, self.timeout):
+                    self._timeouts += 1
+                    raise BudgetExhausted("too many large uploads in progress; retry later")
+            self._in_use += nbytes
+            self._requests += 1
+            self._peak = max(self._peak, self._in_use)
+            self._largest_request = max(self._largest_request, nbytes)
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._in_use -= nbytes
+                self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "capacity_bytes": self.capacity,
+                "in_use_bytes": self._in_use,
+                "peak_bytes": self._peak,
+                "largest_request_bytes": self._largest_request,
+                "requests": self._requests,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "max_upload_bytes": MAX_UPLOAD_BYTES,
+            }
+
+upload_budget = MemoryBudget(UPLOAD_MEMORY_BUDGET_BYTES, UPLOAD_BUDGET_TIMEOUT_SECONDS)
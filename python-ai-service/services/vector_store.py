@@ -0,0 +1,362 @@
+import os
+import json
+import asyncio
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from pinecone import Pinecone, ServerlessSpec
+from dotenv import load_dotenv
+from services.embedding_service import embedding_model
+
+load_dotenv()
+
+# "pinecone" (default), "local" (in-process only) or "mirror" (write both, read local, fail over)
+VECTOR_STORE = os.getenv("VECTOR_STORE", "pinecone").lower()
+# Local index type: "flat" (exact brute-force) or "hnsw" (approximate, needs hnswlib)
+LOCAL_INDEX_TYPE = os.getenv("LOCAL_VECTOR_INDEX", "flat").lower()
+# Optional path prefix for persisting the local store (append-only <path>.vectors and <path>.jsonl).
+# A persisted local store belongs to one process: run a single worker when it is set.
+LOCAL_STORE_PATH = os.getenv("LOCAL_VECTOR_STORE_PATH") or None
+
+Match = namedtuple("Match", ["id", "score", "metadata"])
+
+# --- Pinecone Setup ---
+def init_pinecone():
+    # Initialize Pinecone connection with new API
+    pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
+    
+    # Connect to index
+    index_name = os.getenv("PINECONE_INDEX")
+    
+    # Check if index exists, if not create it
+    if index_name not in pc.list_indexes().names():
+        pc.create_index(
+            name=index_name,
+            dimension=embedding_model.get_sentence_embedding_dimension(),
+            metric="cosine",
+            spec=ServerlessSpec(
+                cloud=os.getenv("PINECONE_CLOUD"),
+                region=os.getenv("PINECONE_REGION")
+            )
+        )
+    
+    # Return the index
+    return pc.Index(index_name)
+
+# Pinecone index, connected on first use so importing this module stays offline
+_pinecone_index = None
+_pinecone_lock = threading.Lock()
+
+def get_pinecone_index():
+    """Returns the shared Pinecone index, connecting on the first call."""
+    global _pinecone_index
+    if _pinecone_index is None:
+        with _pinecone_lock:
+            if _pinecone_index is None:
+                _pinecone_index = init_pinecone()
+    return _pinecone_index
+
+# --- Vector Stores ---
+class VectorStore:
+    """Minimal interface shared by every vector store backend."""
+
+    name = "base"
+
+    def upsert(self, records):
+        """Inserts or replaces (id, vector, metadata) records."""
+        raise NotImplementedError
+
+    def query(self, vector, top_k=3):
+        """Returns up to top_k Matches ordered by descending cosine similarity."""
+        raise NotImplementedError
+
+    def count(self):
+        """Returns the number of stored vectors, or None when unknown."""
+        return None
+
+    def contains(self, ids):
+        """Returns the subset of ids this store holds, or None when it can't tell cheaply."""
+        return None
+
+class PineconeStore(VectorStore):
+    """Vector store backed by the remote Pinecone index."""
+
+    name = "pinecone"
+
+    def upsert(self, records):
+        get_pinecone_index().upsert(vectors=list(records))
+
+    def query(self, vector, top_k=3):
+        results = get_pinecone_index().query(vector=vector, top_k=top_k, include_metadata=True)
+        if not results or not results.matches:
+            return []
+        return [Match(match.id, match.score, match.metadata or {}) for match in results.matches]
+
+class LocalStore(VectorStore):
+    """
+    In-process vector store: a float32 matrix of L2-normalized vectors searched
+    by brute-force dot product, or an HNSW graph when hnswlib is available.
+    With a path, every upsert is appended to <path>.vectors (raw float32 rows) and
+    <path>.jsonl (a dimension header, then one id/metadata line per row); on load the
+    log is replayed, last write winning, and compacted. Appends are serialized by
+    their own lock, so queries never wait on file I/O.
+    """
+
+    name = "local"
+
+    def __init__(self, dimension=None, index_type="flat", path=None):
+        self.dimension = dimension
+        self.index_type = index_type
+        self.path = path
+        self._vectors = np.zeros((0, dimension or 0), dtype=np.float32)
+        self._size = 0
+        self._ids = []
+        self._metadata = []
+        self._rows = {}
+        self._hnsw = None
+        self._lock = threading.RLock()
+        # Held across the in-memory update and the append, so the log keeps the order writes were applied in
+        self._write_lock = threading.Lock()
+
+        if path and (os.path.exists(f"{path}.jsonl") or os.path.exists(f"{path}.npy")):
+            self._load()
+
+    def _normalize(self, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def _ensure_capacity(self, needed):
+        """Grows the matrix geometrically so appends stay amortized O(1)."""
+        if self._vectors.shape[0] >= needed:
+            return
+        capacity = max(needed, 2 * self._vectors.shape[0], 64)
+        grown = np.zeros((capacity, self.dimension), dtype=np.float32)
+        grown[:self._size] = self._vectors[:self._size]
+        self._vectors = grown
+        if self._hnsw is not None:
+            self._hnsw.resize_index(capacity)
+
+    def _init_hnsw(self):
+        if self.index_type != "hnsw" or self._hnsw is not None:
+            return
+        try:
+            import hnswlib
+        except ImportError:
+            print("hnswlib is not installed; using brute-force search for the local vector store")
+            self.index_type = "flat"
+            return
+        self._hnsw = hnswlib.Index(space="ip", dim=self.dimension)
+        self._hnsw.init_index(max_elements=max(self._vectors.shape[0], 64), ef_construction=200, M=16)
+        self._hnsw.set_ef(64)
+        if self._size:
+            self._hnsw.add_items(self._vectors[:self._size], np.arange(self._size))
+
+    def upsert(self, records):
+        records = list(records)
+        if not records:
+            return
+        with self._write_lock:
+            vectors = self._apply(records)
+            if self.path:
+                self._append(records, vectors)
+
+    def _apply(self, records):
+        """Updates the in-memory index and returns the normalized vectors"""
+        with self._lock:
+            if self.dimension is None:
+                self.dimension = len(records[0][1])
+                self._vectors = np.zeros((0, self.dimension), dtype=np.float32)
+            self._init_hnsw()
+
+            vectors = self._normalize([vector for _, vector, _ in records])
+            new_ids = {item_id for item_id, _, _ in records if item_id not in self._rows}
+            self._ensure_capacity(self._size + len(new_ids))
+
+            rows = []
+            for (item_id, _, metadata), vector in zip(records, vectors):
+                row = self._rows.get(item_id)
+                if row is None:
+                    row = self._size
+                    self._size += 1
+                    self._rows[item_id] = row
+                    self._ids.append(item_id)
+                    self._metadata.append(metadata or {})
+                else:
+                    self._metadata[row] = metadata or {}
+                self._vectors[row] = vector
+                rows.append(row)
+
+            if self._hnsw is not None:
+                # Re-adding an existing label replaces its vector
+                self._hnsw.add_items(vectors, np.asarray(rows))
+            return vectors
+
+    def query(self, vector, top_k=3):
+        with self._lock:
+            if not self._size:
+                return []
+            query = self._normalize(vector)
+            k = min(top_k, self._size)
+
+            if self._hnsw is not None:
+                labels, distances = self._hnsw.knn_query(query, k=k)
+                # Inner-product distance is 1 - similarity
+                hits = zip(labels[0], 1.0 - distances[0])
+            else:
+                scores = self._vectors[:self._size] @ query
+                top = np.argpartition(-scores, k - 1)[:k]
+                top = top[np.argsort(-scores[top])]
+                hits = zip(top, scores[top])
+
+            return [Match(self._ids[row], float(score), self._metadata[row]) for row, score in hits]
+
+    def count(self):
+        return self._size
+
+    def contains(self, ids):
+        with self._lock:
+            return {item_id for item_id in ids if item_id in self._rows}
+
+    def _append(self, records, vectors):
+        """Appends just these records to the log; the metadata line is written last and marks the record complete."""
+        with open(f"{self.path}.vectors", "ab") as vectors_file:
+            rows_end = vectors_file.tell()
+            try:
+                vectors_file.write(np.ascontiguousarray(vectors, dtype="<f4").tobytes())
+                vectors_file.flush()
+                with open(f"{self.path}.jsonl", "a", encoding="utf-8") as f:
+                    if f.tell() == 0:
+                        f.write(json.dumps({"dimension": self.dimension}) + "\n")
+                    f.write("".join(json.dumps({"id": item_id, "metadata": metadata or {}}) + "\n"
+                                    for item_id, _, metadata in records))
+            except Exception:
+                # Rows without their lines would shift every later record onto the wrong vector
+                vectors_file.truncate(rows_end)
+                raise
+
+    def _load(self):
+        if not os.path.exists(f"{self.path}.jsonl"):
+            self._load_snapshot()
+        else:
+            self._replay()
+        # Rewrite the log with one record per id; drops superseded rows and any torn tail
+        self._compact()
+
+    def _replay(self):
+        with open(f"{self.path}.jsonl", "rb") as f:
+            data = f.read()
+        header, *lines = data[:data.rfind(b"\n") + 1].decode("utf-8").splitlines() or [None]
+        if header is None:
+            return
+        self.dimension = json.loads(header)["dimension"]
+        self._vectors = np.zeros((0, self.dimension), dtype=np.float32)
+        if not lines:
+            return
+        # Every complete line has a full row before it, since rows are appended first;
+        # rows past the last line belong to a torn append and are dropped
+        vectors = np.fromfile(f"{self.path}.vectors", dtype="<f4", count=len(lines) * self.dimension)
+        vectors = vectors.reshape(len(lines), self.dimension)
+
+        latest = {}
+        for row, line in enumerate(lines):
+            record = json.loads(line)
+            latest[record["id"]] = (row, record["metadata"])
+        rows = [row for row, _ in latest.values()]
+        self._vectors = np.ascontiguousarray(vectors[rows], dtype=np.float32)
+        self._ids = list(latest)
+        self._metadata = [metadata for _, metadata in latest.values()]
+        self._size = len(self._ids)
+        self._rows = {item_id: row for row, item_id in enumerate(self._ids)}
+
+    def _load_snapshot(self):
+        """Reads the older whole-file format (<path>.npy and <path>.json)"""
+        with open(f"{self.path}.npy", "rb") as f:
+            vectors = np.load(f)
+        with open(f"{self.path}.json", encoding="utf-8") as f:
+            saved = json.load(f)
+        self.dimension = vectors.shape[1]
+        self._vectors = vectors.astype(np.float32)
+        self._size = len(saved["ids"])
+        self._ids = saved["ids"]
+        self._metadata = saved["metadata"]
+        self._rows = {item_id: row for row, item_id in enumerate(self._ids)}
+
+    def _compact(self):
+        """Writes the current contents as a fresh log, swapped in atomically"""
+        if self.dimension is None:
+            return
+        with open(f"{self.path}.tmp.vectors", "wb") as f:
+            f.write(np.ascontiguousarray(self._vectors[:self._size], dtype="<f4").tobytes())
+        with open(f"{self.path}.tmp.jsonl", "w", encoding="utf-8") as f:
+            f.write(json.dumps({"dimension": self.dimension}) + "\n")
+            f.write("".join(json.dumps({"id": item_id, "metadata": metadata}) + "\n"
+                            for item_id, metadata in zip(self._ids, self._metadata)))
+        # Vectors first: a crash in between leaves extra rows, which replay ignores
+        os.replace(f"{self.path}.tmp.vectors", f"{self.path}.vectors")
+        os.replace(f"{self.path}.tmp.jsonl", f"{self.path}.jsonl")
+        for legacy in (f"{self.path}.npy", f"{self.path}.json"):
+            if os.path.exists(legacy):
+                os.remove(legacy)
+
+class MirroredStore(VectorStore):
+    """
+    Writes go to every backend; reads go to the first backend and fail over
+    to the next one when it errors or has nothing indexed yet.
+    """
+
+    name = "mirror"
+
+    def __init__(self, *stores):
+        self.stores = stores
+
+    def upsert(self, records):
+        records = list(records)
+        for store in self.stores:
+            store.upsert(records)
+
+    def query(self, vector, top_k=3):
+        last_error = None
+        for store in self.stores:
+            if store.count() == 0:
+                continue
+            try:
+                return store.query(vector, top_k)
+            except Exception as e:
+                print(f"{store.name} vector store query failed, failing over: {e}")
+                last_error = e
+        if last_error:
+            raise last_error
+        return []
+
+    def count(self):
+        return self.stores[0].count()
+
+    def contains(self, ids):
+        return self.stores[0].contains(ids)
+
+def create_vector_store(kind=VECTOR_STORE):
+    """Builds the configured vector store backend."""
+    if kind == "local":
+        return LocalStore(index_type=LOCAL_INDEX_TYPE, path=LOCAL_STORE_PATH)
+    if kind == "mirror":
+        return MirroredStore(LocalStore(index_type=LOCAL_INDEX_TYPE, path=LOCAL_STORE_PATH), PineconeStore())
+    return PineconeStore()
+
+vector_store = create_vector_store()
+
+# Vector store calls may hit the network; they run on a bounded I/O pool instead of the event loop
+_io_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("VECTOR_STORE_IO_WORKERS", os.getenv("PINECONE_IO_WORKERS", "8"))),
+    thread_name_prefix="vector-store-io")
+
+async def query_vectors(vector, top_k=3):
+    """Searches the configured vector store without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_io_executor, lambda: vector_store.query(vector, top_k))
+
+async def upsert_vectors(records):
+    """Writes (id, vector, metadata) records to the configured vector store without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_io_executor, lambda: vector_store.upsert(records))
@@ -0,0 +1,32 @@
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Named process pools for CPU-bound pure-Python work (event extraction, PDF parsing)
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_process_pool(name, workers):
+    """Returns the shared process pool for `name`, starting it on first use"""
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            # spawn, not fork: the API process holds model threads and locks a forked child could inherit mid-use
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pools[name] = pool
+        return pool
+
+def discard_process_pool(name, pool):
+    """Drops a pool whose workers died so the next caller starts a fresh one"""
+    with _pools_lock:
+        if _pools.get(name) is pool:
+            del _pools[name]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def shutdown_process_pools():
+    """Stops every pool that was started"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=False, cancel_futures=True)
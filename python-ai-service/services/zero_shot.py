@@ -0,0 +1,85 @@
+import threading
+
+class ZeroShotEngine:
+    """
+    Zero-shot classifier over a fixed label set that reuses the model and tokenizer
+    of a shared zero-shot pipeline. The "This example is {label}." hypotheses are
+    tokenized once; each request only tokenizes its premise, and the premise/hypothesis
+    pairs of a whole batch of requests run as one padded forward pass. Output matches
+    the HF pipeline with multi_label=False: {"sequence", "labels", "scores"}.
+    """
+
+    def __init__(self, pipeline, labels, hypothesis_template="This example is {}.", max_pairs=256):
+        self.pipeline = pipeline
+        self.labels = list(labels)
+        self.hypothesis_template = hypothesis_template
+        # Upper bound on pairs per forward pass, to cap activation memory
+        self.max_pairs = max_pairs
+        self._hypotheses = None
+        self._lock = threading.Lock()
+
+    def _prepare(self):
+        """Tokenizes the label hypotheses and resolves the entailment logit index, once."""
+        if self._hypotheses is None:
+            with self._lock:
+                if self._hypotheses is None:
+                    tokenizer = self.pipeline.tokenizer
+                    config = self.pipeline.model.config
+                    self._entailment_id = next(
+                        (index for label, index in config.label2id.items() if label.lower().startswith("entail")), -1)
+                    self._max_length = min(tokenizer.model_max_length, config.max_position_embeddings)
+                    hypotheses = [self.hypothesis_template.format(label) for label in self.labels]
+                    self._hypotheses = tokenizer(hypotheses, add_special_tokens=False)["input_ids"]
+        return self._hypotheses
+
+    def _pair_ids(self, premise_ids, hypothesis_ids):
+        """Builds one model input, truncating only the premise (like truncation="only_first")."""
+        tokenizer = self.pipeline.tokenizer
+        special = tokenizer.num_special_tokens_to_add(pair=True)
+        budget = self._max_length - special - len(hypothesis_ids)
+        return tokenizer.build_inputs_with_special_tokens(premise_ids[:budget], hypothesis_ids)
+
+    def _entailment_logits(self, pairs):
+        """Runs padded forward passes over the pairs and returns one entailment logit per pair."""
+        import torch
+
+        tokenizer = self.pipeline.tokenizer
+        model = self.pipeline.model
+        device = next(model.parameters()).device
+        logits = []
+        for start in range(0, len(pairs), self.max_pairs):
+            chunk = pairs[start:start + self.max_pairs]
+            width = max(len(ids) for ids in chunk)
+            input_ids = torch.full((len(chunk), width), tokenizer.pad_token_id, dtype=torch.long)
+            attention_mask = torch.zeros((len(chunk), width), dtype=torch.long)
+            for row, ids in enumerate(chunk):
+                input_ids[row, :len(ids)] = torch.tensor(ids)
+                attention_mask[row, :len(ids)] = 1
+            with torch.no_grad():
+                output = model(input_ids=input_ids.to(device), attention_mask=attention_mask.to(device))
+            logits.append(output.logits[:, self._entailment_id].float().cpu())
+        return torch.cat(logits)
+
+    def classify_batch(self, texts):
+        """Classifies several texts in one batched pass; returns pipeline-style results in order."""
+        import torch
+
+        hypotheses = self._prepare()
+        premises = self.pipeline.tokenizer(list(texts), add_special_tokens=False)["input_ids"]
+        pairs = [self._pair_ids(premise, hypothesis) for premise in premises for hypothesis in hypotheses]
+
+        # Softmax of the entailment logits across labels, as the pipeline does for single-label
+        scores = torch.softmax(self._entailment_logits(pairs).view(len(texts), len(self.labels)), dim=-1)
+
+        results = []
+        for text, row in zip(texts, scores.tolist()):
+            order = sorted(range(len(self.labels)), key=lambda i: row[i], reverse=True)
+            results.append({
+                "sequence": text,
+                "labels": [self.labels[i] for i in order],
+                "scores": [row[i] for i in order],
+            })
+        return results
+
+    def classify(self, text):
+        return self.classify_batch([text])[0]
@@ -0,0 +1,92 @@
+import asyncio
+import threading
+import time
+from services.batching import MicroBatcher
+
+def double_all(items):
+    return [item * 2 for item in items]
+
+def test_batches_concurrent_items_in_order():
+    batcher = MicroBatcher("test-order", double_all, max_batch_size=4, max_wait_ms=20, workers=1)
+    assert batcher.map([1, 2, 3, 4, 5]) == [2, 4, 6, 8, 10]
+    assert batcher.stats()["items"] == 5
+
+def test_batch_failure_reaches_every_caller():
+    def fail(items):
+        raise ValueError("boom")
+    batcher = MicroBatcher("test-failure", fail, max_batch_size=4, max_wait_ms=5, workers=1)
+    future = batcher.submit_async(1)
+    try:
+        future.result(timeout=2)
+    except ValueError as e:
+        assert str(e) == "boom"
+    else:
+        raise AssertionError("expected the batch error")
+    # The worker survives a failed batch
+    batcher.process_batch = double_all
+    assert batcher.submit_async(3).result(timeout=2) == 6
+
+def test_cancelled_request_does_not_kill_the_worker():
+    release = threading.Event()
+
+    def slow_double(items):
+        release.wait(timeout=2)
+        return double_all(items)
+
+    batcher = MicroBatcher("test-cancel", slow_double, max_batch_size=1, max_wait_ms=0, workers=1)
+
+    async def cancel_while_queued():
+        blocker = batcher.submit_async(1)          # occupies the only worker
+        task = asyncio.ensure_future(batcher.asubmit(2))
+        await asyncio.sleep(0.05)
+        task.cancel()                               # cancels the queued concurrent future
+        await asyncio.gather(task, return_exceptions=True)
+        release.set()
+        return blocker
+
+    blocker = asyncio.run(cancel_while_queued())
+    assert blocker.result(timeout=2) == 2
+    assert batcher.submit_async(5).result(timeout=2) == 10
+    assert all(thread.is_alive() for thread in batcher._threads)
+
+def test_cancelled_while_batch_runs_is_not_cancellable():
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_double(items):
+        started.set()
+        release.wait(timeout=2)
+        return double_all(items)
+
+    batcher = MicroBatcher("test-running", slow_double, max_batch_size=1, max_wait_ms=0, workers=1)
+    future = batcher.submit_async(4)
+    assert started.wait(timeout=2)
+    assert not future.cancel()
+    release.set()
+    assert future.result(timeout=2) == 8
+    time.sleep(0.01)
+    assert batcher.submit_async(1).result(timeout=2) == 2
+
+def test_bulk_calls_share_the_worker_limit():
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def tracked(value):
+        with lock:
+            running.append(value)
+            peak.append(len(running))
+        time.sleep(0.02)
+        with lock:
+            running.remove(value)
+        return value
+
+    batcher = MicroBatcher("test-calls", lambda items: [tracked(item) for item in items],
+                           max_batch_size=1, max_wait_ms=0, workers=1)
+    futures = [batcher.submit_call(tracked, f"call-{i}") for i in range(3)]
+    futures += [batcher.submit_async(f"item-{i}") for i in range(3)]
+    assert sorted(future.result(timeout=2) for future in futures) == sorted(
+        [f"call-{i}" for i in range(3)] + [f"item-{i}" for i in range(3)])
+    assert max(peak) == 1
+    assert asyncio.run(batcher.acall(lambda: "done")) == "done"
+    assert batcher.stats()["bulk_calls"] == 4
@@ -0,0 +1,68 @@
+from datetime import datetime, timezone
+from services.extract_event_details import (
+    MONTH_DATE, NUMERIC_DATE, _match_relative_date, _parse_month_date, _parse_numeric_date,
+    extract_event_details,
+)
+
+# A Saturday, so weekday and rollover cases don't depend on when the tests run
+TODAY = datetime(2025, 3, 15, tzinfo=timezone.utc)
+
+def numeric(text, today=TODAY):
+    return _parse_numeric_date(NUMERIC_DATE.search(text), today)
+
+def month(text, today=TODAY):
+    return _parse_month_date(MONTH_DATE.search(text), today)
+
+def day(year, month_number, day_number):
+    return datetime(year, month_number, day_number, tzinfo=timezone.utc)
+
+def test_yearless_dates_already_past_roll_into_next_year():
+    assert numeric("lunch on 3/20") == day(2025, 3, 20)
+    assert numeric("lunch on 3/15") == TODAY
+    assert numeric("lunch on 1/10") == day(2026, 1, 10)
+    assert month("lunch on jan 10th") == day(2026, 1, 10)
+
+def test_explicit_years_never_roll():
+    assert numeric("review on 1/10/2025") == day(2025, 1, 10)
+    assert month("review on january 10, 2025") == day(2025, 1, 10)
+
+def test_two_digit_years_follow_strptime():
+    assert numeric("3/20/30") == day(2030, 3, 20)
+    assert numeric("3/20/99") == day(1999, 3, 20)
+    assert month("march 20, 26") == day(2026, 3, 20)
+
+def test_trailing_number_without_comma_is_not_a_year():
+    assert month("march 20 10am") == day(2025, 3, 20)
+
+def test_day_first_only_when_first_number_cannot_be_a_month():
+    assert numeric("party on 25/12") == day(2025, 12, 25)
+    assert numeric("party on 12/25") == day(2025, 12, 25)
+    assert numeric("call on 4/5") == day(2025, 4, 5)
+
+def test_impossible_dates_are_left_to_the_fallback():
+    assert numeric("13/13") is None
+    assert month("feb 30") is None
+
+def test_relative_dates():
+    assert _match_relative_date("sync today", TODAY) == TODAY
+    assert _match_relative_date("sync day after tomorrow", TODAY) == day(2025, 3, 17)
+    assert _match_relative_date("sync tomorrow", TODAY) == day(2025, 3, 16)
+    assert _match_relative_date("sync next monday", TODAY) == day(2025, 3, 17)
+    assert _match_relative_date("sync next week", TODAY) == day(2025, 3, 22)
+
+def test_number_words_in_offsets():
+    assert _match_relative_date("demo in two weeks", TODAY) == day(2025, 3, 29)
+    assert _match_relative_date("demo in a day", TODAY) == day(2025, 3, 16)
+    assert _match_relative_date("demo in 10 days", TODAY) == day(2025, 3, 25)
+
+def test_month_offsets_clamp_to_the_last_day():
+    end_of_january = day(2025, 1, 31)
+    assert _match_relative_date("review in 1 month", end_of_january) == day(2025, 2, 28)
+    assert _match_relative_date("review in 13 months", end_of_january) == day(2026, 2, 28)
+    assert _match_relative_date("review in 11 months", TODAY) == day(2026, 2, 15)
+
+def test_out_of_range_offsets_fall_through():
+    assert _match_relative_date("meeting in 100000000 days", TODAY) is None
+    assert _match_relative_date("review in 99999 months", TODAY) is None
+    for text in ("meeting in 100000000 days", "review in 99999 months"):
+        assert extract_event_details(text)["startTime"]
@@ -0,0 +1,41 @@
+from collections import Counter
+import numpy as np
+from services import model_registry
+from services.zero_shot import ZeroShotEngine
+
+ZERO_SHOT_KEY = "zero-shot-classification:facebook/bart-large-mnli"
+
+class FakeModel:
+    """Stands in for any pipeline: zero-shot calls rank labels in order, encodes return constant vectors"""
+
+    def __call__(self, text, candidate_labels):
+        scores = [1 / (rank + 2) for rank in range(len(candidate_labels))]
+        return {"sequence": text, "labels": list(candidate_labels), "scores": scores}
+
+    def encode(self, texts, **kwargs):
+        return np.ones((len(texts), 4), dtype=np.float32)
+
+def test_zero_shot_classifier_loads_once_across_modules(monkeypatch):
+    loads = Counter()
+
+    def counting_load(task, model_name):
+        loads[(task, model_name)] += 1
+        return FakeModel()
+
+    monkeypatch.setattr(model_registry, "_load", counting_load)
+    monkeypatch.setattr(model_registry, "_models", {})
+    monkeypatch.setattr(model_registry, "_load_counts", Counter())
+    # The real engine drives the model through torch; the shared pipeline handle is what's under test
+    monkeypatch.setattr(ZeroShotEngine, "classify_batch",
+                        lambda self, texts: [self.pipeline(text, candidate_labels=self.labels) for text in texts])
+
+    from services import classification, intent, text_processing
+
+    # Not caught by the task rules, and the constant embeddings leave the cascade unsure, so BART runs
+    label, path = text_processing.classify_text_with_path("tell me something interesting about owls")
+    assert path in ("model", "keywords", "domain_fallback") and label
+    assert classification.classify_text("a new ransomware strain") == "AI"
+    assert intent.classify_intent("summarize this thread") == "summarize"
+
+    assert model_registry.get_load_counts()[ZERO_SHOT_KEY] == 1
+    assert loads[("zero-shot-classification", "facebook/bart-large-mnli")] == 1